@@ -1,11 +1,13 @@
+import threading
 from typing import List, Optional, Type, TypeVar, Generic
 
 from langchain_core.messages import HumanMessage
-from langchain.chat_models import init_chat_model
 from langchain_core.tools import BaseTool
-from langgraph.prebuilt import create_react_agent
+from pydantic import ValidationError
 from sqlmodel import SQLModel
 
+from agent.response_cache import BaseResponseCache
+
 T = TypeVar("T", bound=SQLModel)
 
 
@@ -18,23 +20,109 @@ class Agent(Generic[T]):
         prompt: str,
         response_format: Type[T],
         tools: Optional[List[BaseTool]] = None,
+        cache: Optional[BaseResponseCache] = None,
     ):
         self.name = name
-        self.model = init_chat_model(model=model_name, model_provider=model_provider)
+        self.model_name = model_name
+        self.model_provider = model_provider
         self.tools = tools or []
         self.prompt = prompt
         self.response_format = response_format
+        self.cache = cache
+
+        self._model = None
+        self._agent = None
+        self._lock = threading.Lock()
+
+    @property
+    def model(self):
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    from langchain.chat_models import init_chat_model
+
+                    self._model = init_chat_model(
+                        model=self.model_name, model_provider=self.model_provider
+                    )
+        return self._model
+
+    @property
+    def agent(self):
+        # Compiling the ReAct graph is expensive, so it is built on the first uncached call and reused
+        if self._agent is None:
+            model = self.model
+            with self._lock:
+                if self._agent is None:
+                    self._agent = self.create_agent(model=model)
+        return self._agent
+
+    def create_agent(self, model):
+        from langgraph.prebuilt import create_react_agent
 
-    def create_agent(self):
         return create_react_agent(
-            self.model,
+            model,
             tools=self.tools,
             response_format=self.response_format,
             prompt=self.prompt,
             name=self.name,
         )
 
+    def _cache_key(self, content: str) -> str:
+        return self.cache.build_key(
+            model_name=self.model_name,
+            prompt=self.prompt,
+            response_format=self.response_format,
+            content=content,
+        )
+
+    def _read_cache(self, key: str) -> Optional[T]:
+        cached = self.cache.get(key)
+        if cached is None:
+            return None
+
+        try:
+            return self.response_format.model_validate_json(cached)
+        except ValidationError:
+            # The response model changed shape since this entry was written
+            return None
+
+    def _write_cache(self, key: str, response: T) -> None:
+        self.cache.set(key, response.model_dump_json())
+
+    @staticmethod
+    def _build_input(content: str):
+        return {"messages": [HumanMessage(content=content)]}
+
     def invoke_agent(self, content: str) -> T:
-        input = {"messages": [HumanMessage(content=content)]}
-        response = self.create_agent().invoke(input, config={"recursion_limit": 100})
-        return response["structured_response"]
+        if self.cache:
+            key = self._cache_key(content=content)
+            cached = self._read_cache(key=key)
+            if cached is not None:
+                return cached
+
+        response = self.agent.invoke(
+            self._build_input(content=content), config={"recursion_limit": 100}
+        )
+        structured_response = response["structured_response"]
+
+        if self.cache:
+            self._write_cache(key=key, response=structured_response)
+
+        return structured_response
+
+    async def ainvoke_agent(self, content: str) -> T:
+        if self.cache:
+            key = self._cache_key(content=content)
+            cached = self._read_cache(key=key)
+            if cached is not None:
+                return cached
+
+        response = await self.agent.ainvoke(
+            self._build_input(content=content), config={"recursion_limit": 100}
+        )
+        structured_response = response["structured_response"]
+
+        if self.cache:
+            self._write_cache(key=key, response=structured_response)
+
+        return structured_response
@@ -1,17 +1,32 @@
+import asyncio
 import json
-from typing import List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple, TypeVar
+from langchain_core.runnables import RunnableLambda
 from langgraph.graph import StateGraph, END
 from pydantic import BaseModel
 
 from agent.agent import Agent
-from models.information import TransactionInformation
+from extract.template_parser import TemplateParser
+from ingest.fingerprint import fingerprint_transactions
+from models.information import (
+    CategoryInformation,
+    TrackedCategoryInformation,
+    TrackedParsedInformation,
+    TransactionInformation,
+)
 from models.inputs import CategoryInformationInputs, ParsedInformationInputs
 from models.tables import ParsedStatement
 
+C = TypeVar("C")
+R = TypeVar("R")
+
 
 class TransactionState(BaseModel):
     parsed_statements: List[ParsedStatement] = []
     parsing_information: Optional[ParsedInformationInputs] = None
+    new_information: Optional[List[TrackedParsedInformation]] = None
+    fingerprints: Dict[str, str] = {}
     categorising_information: Optional[CategoryInformationInputs] = None
     transactions: Optional[List[TransactionInformation]] = None
 
@@ -21,48 +36,427 @@ class AgentChain:
         self,
         parsing_agent: Agent,
         categorising_agent: Agent,
+        transaction_filter: Optional[
+            Callable[[List[TrackedParsedInformation]], List[TrackedParsedInformation]]
+        ] = None,
+        categorising_chunk_size: Optional[int] = None,
+        max_concurrency: int = 4,
+        max_retries: int = 2,
+        parsing_token_budget: Optional[int] = None,
+        parsing_overlap_lines: int = 2,
+        template_parser: Optional[TemplateParser] = None,
+        category_resolver: Optional[
+            Callable[[List[TrackedParsedInformation]], Dict[str, CategoryInformation]]
+        ] = None,
     ):
         self.parsing_agent = parsing_agent
         self.categorsing_agent = categorising_agent
+        self.transaction_filter = transaction_filter
+        self.categorising_chunk_size = categorising_chunk_size
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.parsing_token_budget = parsing_token_budget
+        self.parsing_overlap_lines = parsing_overlap_lines
+        self.template_parser = template_parser
+        self.category_resolver = category_resolver
 
         self.graph = self.build_graph()
 
-    def _parsing_node(self, state: TransactionState) -> TransactionState:
-        parsed_statements = state.parsed_statements
-
-        content = ""
-        for parsed_statement in parsed_statements:
-            content += f"{parsed_statement.strategy_name}:\n\n{parsed_statement.strategy_result}\n\n\n"
-
-        parsing_information = self.parsing_agent.invoke_agent(content=content)
-        state.parsing_information = parsing_information
-        return state
-
-    def _categorising_node(self, state: TransactionState) -> TransactionState:
-        parsed = state.parsing_information.parsed_information_inputs
+    @staticmethod
+    def _parsing_content(parsed_statements: List[ParsedStatement]) -> str:
+        return "".join(
+            f"{parsed_statement.strategy_name}:\n\n{parsed_statement.strategy_result}\n\n\n"
+            for parsed_statement in parsed_statements
+        )
 
+    @staticmethod
+    def _categorising_content(parsed: List[TrackedParsedInformation]) -> str:
         content = [
             {p.id: {"description": p.data.description, "amount": p.data.amount}}
             for p in parsed
         ]
 
-        content = json.dumps(content)
+        return json.dumps(content)
+
+    @staticmethod
+    def _chunk(items: List[C], chunk_size: Optional[int]) -> List[List[C]]:
+        if not chunk_size:
+            return [items]
+        return [items[i : i + chunk_size] for i in range(0, len(items), chunk_size)]
+
+    def _map_chunks(
+        self,
+        invoke: Callable[[C], R],
+        chunks: List[C],
+        is_valid: Callable[[C, R], bool],
+    ) -> List[R]:
+        """
+        Runs `invoke` over the chunks with at most `max_concurrency` in flight.
+        Only the chunks that raise or return an invalid result are retried.
+        """
+        results: List[Optional[R]] = [None] * len(chunks)
+        pending = list(range(len(chunks)))
+        error: Optional[Exception] = None
+
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            for _ in range(self.max_retries + 1):
+                futures = {i: executor.submit(invoke, chunks[i]) for i in pending}
+                pending = []
+                for i, future in futures.items():
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        error = e
+                        pending.append(i)
+                        continue
+
+                    if is_valid(chunks[i], result):
+                        results[i] = result
+                    else:
+                        pending.append(i)
+
+                if not pending:
+                    return results
+
+        raise RuntimeError(
+            f"{len(pending)} of {len(chunks)} chunks failed after {self.max_retries + 1} attempts"
+        ) from error
+
+    async def _amap_chunks(
+        self,
+        ainvoke: Callable[[C], Awaitable[R]],
+        chunks: List[C],
+        is_valid: Callable[[C, R], bool],
+    ) -> List[R]:
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def bounded(chunk: C) -> R:
+            async with semaphore:
+                return await ainvoke(chunk)
+
+        results: List[Optional[R]] = [None] * len(chunks)
+        pending = list(range(len(chunks)))
+        error: Optional[BaseException] = None
+
+        for _ in range(self.max_retries + 1):
+            outcomes = await asyncio.gather(
+                *(bounded(chunks[i]) for i in pending), return_exceptions=True
+            )
+            failed = []
+            for i, outcome in zip(pending, outcomes):
+                if isinstance(outcome, Exception):
+                    error = outcome
+                    failed.append(i)
+                elif is_valid(chunks[i], outcome):
+                    results[i] = outcome
+                else:
+                    failed.append(i)
+
+            pending = failed
+            if not pending:
+                return results
+
+        raise RuntimeError(
+            f"{len(pending)} of {len(chunks)} chunks failed after {self.max_retries + 1} attempts"
+        ) from error
+
+    @staticmethod
+    def _is_fully_categorised(
+        chunk: List[TrackedParsedInformation], result: CategoryInformationInputs
+    ) -> bool:
+        returned = {c.id for c in result.category_information_inputs}
+        return all(p.id in returned for p in chunk)
+
+    @staticmethod
+    def _merge_categorised(
+        chunks: List[List[TrackedParsedInformation]],
+        results: List[CategoryInformationInputs],
+    ) -> CategoryInformationInputs:
+        merged = {}
+        for chunk, result in zip(chunks, results):
+            ids = {p.id for p in chunk}
+            for c in result.category_information_inputs:
+                if c.id in ids:
+                    merged[c.id] = c
+
+        return CategoryInformationInputs(
+            category_information_inputs=[
+                merged[p.id] for chunk in chunks for p in chunk
+            ]
+        )
+
+    @staticmethod
+    def _estimate_tokens(text: str) -> int:
+        # Roughly four characters per token for the Latin-script text found in statements
+        return len(text) // 4 + 1
+
+    def _split_segments(self, text: str) -> List[str]:
+        """
+        Splits a strategy result on blank lines (pages and table blocks), falling back to
+        single rows for blocks that do not fit the token budget on their own.
+        """
+        segments = []
+        for block in text.split("\n\n"):
+            if not block.strip():
+                continue
+            if self._estimate_tokens(block) <= self.parsing_token_budget:
+                segments.append(block)
+            else:
+                segments.extend(line for line in block.splitlines() if line.strip())
+        return segments
+
+    def _parsing_chunks(self, parsed_statements: List[ParsedStatement]) -> List[str]:
+        chunks = []
+        for parsed_statement in parsed_statements:
+            texts: List[str] = []
+            current: List[str] = []
+            for segment in self._split_segments(parsed_statement.strategy_result):
+                candidate = "\n\n".join(current + [segment])
+                if (
+                    current
+                    and self._estimate_tokens(candidate) > self.parsing_token_budget
+                ):
+                    texts.append("\n\n".join(current))
+                    # Carry the last rows over so transactions on the boundary are seen whole
+                    overlap = texts[-1].splitlines()[-self.parsing_overlap_lines :]
+                    current = ["\n".join(overlap)] if self.parsing_overlap_lines else []
+                current.append(segment)
+            if current:
+                texts.append("\n\n".join(current))
+
+            chunks.extend(
+                f"{parsed_statement.strategy_name} (part {i} of {len(texts)}):\n\n{text}"
+                for i, text in enumerate(texts, start=1)
+            )
+        return chunks
+
+    @staticmethod
+    def _merge_parsed(
+        results: List[ParsedInformationInputs],
+    ) -> ParsedInformationInputs:
+        """
+        Concatenates chunk results in order, dropping rows repeated in the overlaps and
+        re-numbering ids so they stay unique across chunks.
+        """
+        seen = set()
+        merged = []
+        for result in results:
+            for p in result.parsed_information_inputs:
+                key = (
+                    p.data.transaction_date,
+                    p.data.description.strip(),
+                    round(p.data.amount, 2),
+                    round(p.data.balance, 2),
+                )
+                if key in seen:
+                    continue
+                seen.add(key)
+                merged.append(
+                    TrackedParsedInformation(id=str(len(merged)), data=p.data)
+                )
+
+        return ParsedInformationInputs(parsed_information_inputs=merged)
+
+    def _needs_chunking(self, content: str) -> bool:
+        return (
+            self.parsing_token_budget is not None
+            and self._estimate_tokens(content) > self.parsing_token_budget
+        )
+
+    def _template_parse(
+        self, parsed_statements: List[ParsedStatement]
+    ) -> Optional[ParsedInformationInputs]:
+        if not self.template_parser:
+            return None
+
+        for parsed_statement in parsed_statements:
+            parsing_information = self.template_parser.parse(
+                parsed_statement.strategy_result
+            )
+            if parsing_information is not None:
+                return parsing_information
+        return None
+
+    def _agent_parse(
+        self, parsed_statements: List[ParsedStatement]
+    ) -> ParsedInformationInputs:
+        content = self._parsing_content(parsed_statements)
+
+        if not self._needs_chunking(content):
+            return self.parsing_agent.invoke_agent(content=content)
+
+        results = self._map_chunks(
+            lambda chunk: self.parsing_agent.invoke_agent(content=chunk),
+            self._parsing_chunks(parsed_statements),
+            lambda chunk, result: result is not None,
+        )
+        return self._merge_parsed(results)
+
+    async def _aagent_parse(
+        self, parsed_statements: List[ParsedStatement]
+    ) -> ParsedInformationInputs:
+        content = self._parsing_content(parsed_statements)
+
+        if not self._needs_chunking(content):
+            return await self.parsing_agent.ainvoke_agent(content=content)
+
+        results = await self._amap_chunks(
+            lambda chunk: self.parsing_agent.ainvoke_agent(content=chunk),
+            self._parsing_chunks(parsed_statements),
+            lambda chunk, result: result is not None,
+        )
+        return self._merge_parsed(results)
+
+    def parse(
+        self, parsed_statements: List[ParsedStatement]
+    ) -> ParsedInformationInputs:
+        # Known layouts that reconcile against the running balance skip the parsing agent
+        parsing_information = self._template_parse(parsed_statements)
+        if parsing_information is None:
+            parsing_information = self._agent_parse(parsed_statements)
+        return parsing_information
+
+    async def aparse(
+        self, parsed_statements: List[ParsedStatement]
+    ) -> ParsedInformationInputs:
+        parsing_information = self._template_parse(parsed_statements)
+        if parsing_information is None:
+            parsing_information = await self._aagent_parse(parsed_statements)
+        return parsing_information
+
+    def filter(
+        self, parsed: List[TrackedParsedInformation]
+    ) -> Tuple[List[TrackedParsedInformation], Dict[str, str]]:
+        """
+        Returns the transactions left after the transaction filter and the fingerprint of every
+        parsed transaction by id. Fingerprints need the whole statement, since they count repeats
+        across all of its rows.
+        """
+        fingerprints = dict(
+            zip(
+                [p.id for p in parsed],
+                fingerprint_transactions([p.data for p in parsed]),
+            )
+        )
+
+        if self.transaction_filter:
+            parsed = self.transaction_filter(parsed)
+        return parsed, fingerprints
 
-        categorising_information = self.categorsing_agent.invoke_agent(content=content)
-        state.categorising_information = categorising_information
+    def _parsing_node(self, state: TransactionState) -> TransactionState:
+        state.parsing_information = self.parse(state.parsed_statements)
         return state
 
-    def _consolidating_node(self, state: TransactionState):
-        parsed = state.parsing_information.parsed_information_inputs
-        categorised = state.categorising_information.category_information_inputs
+    async def _aparsing_node(self, state: TransactionState) -> TransactionState:
+        state.parsing_information = await self.aparse(state.parsed_statements)
+        return state
+
+    def _filtering_node(self, state: TransactionState) -> TransactionState:
+        state.new_information, state.fingerprints = self.filter(
+            state.parsing_information.parsed_information_inputs
+        )
+        return state
+
+    async def _afiltering_node(self, state: TransactionState) -> TransactionState:
+        # Filters hit the database synchronously, so keep them off the event loop
+        return await asyncio.to_thread(self._filtering_node, state)
+
+    def _agent_categorise(
+        self, parsed: List[TrackedParsedInformation]
+    ) -> CategoryInformationInputs:
+        if not parsed:
+            return CategoryInformationInputs(category_information_inputs=[])
+
+        if len(parsed) <= (self.categorising_chunk_size or len(parsed)):
+            content = self._categorising_content(parsed)
+            return self.categorsing_agent.invoke_agent(content=content)
+
+        chunks = self._chunk(parsed, self.categorising_chunk_size)
+        results = self._map_chunks(
+            lambda chunk: self.categorsing_agent.invoke_agent(
+                content=self._categorising_content(chunk)
+            ),
+            chunks,
+            self._is_fully_categorised,
+        )
+        return self._merge_categorised(chunks, results)
+
+    async def _aagent_categorise(
+        self, parsed: List[TrackedParsedInformation]
+    ) -> CategoryInformationInputs:
+        if not parsed:
+            return CategoryInformationInputs(category_information_inputs=[])
+
+        if len(parsed) <= (self.categorising_chunk_size or len(parsed)):
+            content = self._categorising_content(parsed)
+            return await self.categorsing_agent.ainvoke_agent(content=content)
+
+        chunks = self._chunk(parsed, self.categorising_chunk_size)
+        results = await self._amap_chunks(
+            lambda chunk: self.categorsing_agent.ainvoke_agent(
+                content=self._categorising_content(chunk)
+            ),
+            chunks,
+            self._is_fully_categorised,
+        )
+        return self._merge_categorised(chunks, results)
+
+    def _resolve_categories(
+        self, parsed: List[TrackedParsedInformation]
+    ) -> Dict[str, CategoryInformation]:
+        if not self.category_resolver or not parsed:
+            return {}
+        return self.category_resolver(parsed)
+
+    @staticmethod
+    def _combine_categorised(
+        parsed: List[TrackedParsedInformation],
+        resolved: Dict[str, CategoryInformation],
+        categorised: CategoryInformationInputs,
+    ) -> CategoryInformationInputs:
+        mapping = {
+            id: TrackedCategoryInformation(id=id, data=data)
+            for id, data in resolved.items()
+        }
+        mapping.update({c.id: c for c in categorised.category_information_inputs})
+
+        return CategoryInformationInputs(
+            category_information_inputs=[
+                mapping[p.id] for p in parsed if p.id in mapping
+            ]
+        )
 
+    def categorise(
+        self, parsed: List[TrackedParsedInformation]
+    ) -> CategoryInformationInputs:
+        # Transactions resolved from similar, already-categorised ones never reach the agent
+        resolved = self._resolve_categories(parsed)
+        unresolved = [p for p in parsed if p.id not in resolved]
+        categorised = self._agent_categorise(unresolved)
+
+        return self._combine_categorised(parsed, resolved, categorised)
+
+    async def acategorise(
+        self, parsed: List[TrackedParsedInformation]
+    ) -> CategoryInformationInputs:
+        resolved = await asyncio.to_thread(self._resolve_categories, parsed)
+        unresolved = [p for p in parsed if p.id not in resolved]
+        categorised = await self._aagent_categorise(unresolved)
+
+        return self._combine_categorised(parsed, resolved, categorised)
+
+    @staticmethod
+    def consolidate(
+        parsed: List[TrackedParsedInformation],
+        categorised: CategoryInformationInputs,
+        fingerprints: Dict[str, str],
+    ) -> List[TransactionInformation]:
         parsed_mapping = {p.id: p.data for p in parsed}
-        categorised_mapping = {c.id: c.data for c in categorised}
 
         transaction_information_inputs = []
-        for c in categorised:
+        for c in categorised.category_information_inputs:
             parsed = parsed_mapping[c.id]
-            category = categorised_mapping[c.id]
+            category = c.data
 
             transaction_information_inputs.append(
                 TransactionInformation(
@@ -70,34 +464,83 @@ class AgentChain:
                     amount=parsed.amount,
                     balance=parsed.balance,
                     description=parsed.description,
+                    description_embedding=parsed.description_embedding,
                     cleaned_description=category.cleaned_description,
                     category=category.category,
                     reasoning=category.reasoning,
+                    fingerprint=fingerprints.get(c.id),
                 )
             )
+        return transaction_information_inputs
 
-        state.transactions = transaction_information_inputs
+    def _categorising_node(self, state: TransactionState) -> TransactionState:
+        state.categorising_information = self.categorise(state.new_information or [])
+        return state
+
+    async def _acategorising_node(self, state: TransactionState) -> TransactionState:
+        state.categorising_information = await self.acategorise(
+            state.new_information or []
+        )
+        return state
+
+    def _consolidating_node(self, state: TransactionState):
+        state.transactions = self.consolidate(
+            parsed=state.parsing_information.parsed_information_inputs,
+            categorised=state.categorising_information,
+            fingerprints=state.fingerprints,
+        )
         return state
 
     def build_graph(self):
         builder = StateGraph(TransactionState)
 
-        builder.add_node("parsing", self._parsing_node)
-        builder.add_node("categorising", self._categorising_node)
+        # Each node carries a sync and an async implementation so the graph supports invoke and ainvoke
+        builder.add_node(
+            "parsing", RunnableLambda(self._parsing_node, afunc=self._aparsing_node)
+        )
+        builder.add_node(
+            "filtering",
+            RunnableLambda(self._filtering_node, afunc=self._afiltering_node),
+        )
+        builder.add_node(
+            "categorising",
+            RunnableLambda(self._categorising_node, afunc=self._acategorising_node),
+        )
         builder.add_node("consolidating", self._consolidating_node)
 
         builder.set_entry_point("parsing")
-        builder.add_edge("parsing", "categorising")
+        builder.add_edge("parsing", "filtering")
+        builder.add_edge("filtering", "categorising")
         builder.add_edge("categorising", "consolidating")
         builder.add_edge("consolidating", END)
 
         return builder.compile()
 
+    def process_statement(
+        self, parsed_statements: List[ParsedStatement]
+    ) -> TransactionState:
+        result = self.graph.invoke(
+            TransactionState(parsed_statements=parsed_statements)
+        )
+
+        return TransactionState.model_validate(result)
+
     def process_transactions(
-        self, parsed_statements: ParsedStatement
+        self, parsed_statements: List[ParsedStatement]
     ) -> List[TransactionInformation]:
-        result = self.graph.invoke(
+        return self.process_statement(parsed_statements=parsed_statements).transactions
+
+    async def aprocess_statement(
+        self, parsed_statements: List[ParsedStatement]
+    ) -> TransactionState:
+        result = await self.graph.ainvoke(
             TransactionState(parsed_statements=parsed_statements)
         )
 
-        return result.get("transactions")
+        return TransactionState.model_validate(result)
+
+    async def aprocess_transactions(
+        self, parsed_statements: List[ParsedStatement]
+    ) -> List[TransactionInformation]:
+        state = await self.aprocess_statement(parsed_statements=parsed_statements)
+        return state.transactions
@@ -0,0 +1,263 @@
+from enum import Enum
+from typing import AsyncIterator, List, Optional, Type
+
+import numpy as np
+from sqlalchemy import Row, select
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.orm.attributes import InstrumentedAttribute
+from sqlmodel import SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from service import Service, T, build_postgresql_url
+
+
+class AsyncService:
+    """
+    asyncio counterpart of Service on an asyncpg engine.
+    Statements are built by the same helpers as Service, so both stay in step.
+    """
+
+    def __init__(
+        self,
+        url: Optional[str],
+        username: Optional[str],
+        password: Optional[str],
+        port: Optional[str],
+        database_name: Optional[str],
+        host: str = "localhost",
+        driver: str = "postgresql+asyncpg",
+        pool_size: int = 5,
+        max_overflow: int = 10,
+        pool_pre_ping: bool = True,
+        pool_recycle: int = 1800,
+        statement_timeout: Optional[int] = None,
+    ):
+        self.username = username
+        self.password = password
+        self.host = host
+        self.port = port
+        self.database_name = database_name
+        self.driver = driver
+
+        if not url:
+            url = build_postgresql_url(
+                driver=self.driver,
+                username=self.username,
+                password=self.password,
+                host=self.host,
+                port=self.port,
+                database_name=self.database_name,
+            )
+
+        connect_args = {}
+        if statement_timeout is not None:
+            connect_args["server_settings"] = {
+                "statement_timeout": str(int(statement_timeout))
+            }
+
+        self.engine = create_async_engine(
+            url,
+            pool_size=pool_size,
+            max_overflow=max_overflow,
+            pool_pre_ping=pool_pre_ping,
+            pool_recycle=pool_recycle,
+            connect_args=connect_args,
+        )
+
+    async def dispose(self) -> None:
+        await self.engine.dispose()
+
+    async def create_tables(self, tables=None):
+        async with self.engine.begin() as connection:
+            await connection.run_sync(SQLModel.metadata.create_all, tables=tables)
+
+    async def delete_tables(self, tables=None):
+        async with self.engine.begin() as connection:
+            await connection.run_sync(SQLModel.metadata.drop_all, tables=tables)
+
+    async def create_single(self, model: SQLModel):
+        async with AsyncSession(self.engine) as session:
+            session.add(model)
+            await session.commit()
+
+    async def read_all(self, model: Type[T]) -> List[T]:
+        async with AsyncSession(self.engine) as session:
+            result = await session.execute(select(model))
+            return result.scalars().all()
+
+    async def exists(self, column: InstrumentedAttribute, value) -> bool:
+        async with AsyncSession(self.engine) as session:
+            statement = select(column).where(column == value).limit(1)
+            result = await session.execute(statement)
+            return result.first() is not None
+
+    async def read_where(self, model: Type[T], *conditions) -> List[T]:
+        async with AsyncSession(self.engine) as session:
+            result = await session.execute(select(model).where(*conditions))
+            return result.scalars().all()
+
+    async def iter_all(
+        self,
+        model: Type[T],
+        columns: Optional[List[InstrumentedAttribute]] = None,
+        chunk_size: int = 1000,
+    ) -> AsyncIterator[T]:
+        statement = select(*columns) if columns else select(model)
+        statement = statement.execution_options(yield_per=chunk_size)
+
+        async with AsyncSession(self.engine) as session:
+            result = await session.stream(statement)
+            if not columns:
+                result = result.scalars()
+            async for item in result:
+                yield item
+
+    async def create_many(
+        self,
+        models: List[SQLModel],
+        batch_size: int = 1000,
+        conflict_columns: Optional[List[str]] = None,
+    ):
+        async with AsyncSession(self.engine) as session:
+            for statement, rows in Service._bulk_insert_statements(
+                models=models, batch_size=batch_size, conflict_columns=conflict_columns
+            ):
+                await session.execute(statement, rows)
+            await session.commit()
+
+    async def _create_graph(
+        self,
+        session: AsyncSession,
+        model: SQLModel,
+        batch_size: int,
+        conflict_columns: Optional[List[str]] = None,
+    ) -> List[SQLModel]:
+        result = await session.execute(Service._graph_parent_statement(model))
+        children = Service._graph_children(model=model, primary_key=result.one())
+
+        for statement, rows in Service._bulk_insert_statements(
+            models=children,
+            batch_size=batch_size,
+            conflict_columns=conflict_columns,
+        ):
+            await session.execute(statement, rows)
+        return children
+
+    async def create_graph(
+        self,
+        model: SQLModel,
+        batch_size: int = 1000,
+        conflict_columns: Optional[List[str]] = None,
+    ) -> SQLModel:
+        async with AsyncSession(self.engine) as session:
+            await self._create_graph(
+                session=session,
+                model=model,
+                batch_size=batch_size,
+                conflict_columns=conflict_columns,
+            )
+            await session.commit()
+
+        return model
+
+    async def delete_all(self, model: Type[SQLModel]):
+        async with AsyncSession(self.engine) as session:
+            result = await session.execute(select(model))
+            for item in result.scalars().all():
+                await session.delete(item)
+            await session.commit()
+
+    async def _set_ef_search(
+        self, session: AsyncSession, ef_search: Optional[int]
+    ) -> None:
+        if ef_search is not None:
+            await session.execute(Service._ef_search_statement(ef_search=ef_search))
+
+    async def search_by_embedding(
+        self,
+        embedding: List[float],
+        embedding_column: InstrumentedAttribute,
+        model: Type[SQLModel],
+        limit: int = 10,
+        ef_search: Optional[int] = None,
+        columns: Optional[List[InstrumentedAttribute]] = None,
+        quantization: Optional[str] = None,
+        candidates: Optional[int] = None,
+    ) -> List[Row]:
+        return await self.nearest_by_embedding(
+            embedding=embedding,
+            embedding_column=embedding_column,
+            columns=columns or Service._projection(model, embedding_column),
+            limit=limit,
+            quantization=quantization,
+            candidates=candidates,
+            ef_search=ef_search,
+        )
+
+    async def nearest_by_embedding(
+        self,
+        embedding: List[float],
+        embedding_column: InstrumentedAttribute,
+        columns: List[InstrumentedAttribute],
+        limit: int = 10,
+        quantization: Optional[str] = None,
+        candidates: Optional[int] = None,
+        ef_search: Optional[int] = None,
+    ) -> List[Row]:
+        results = await self.nearest_by_embeddings(
+            embeddings=np.asarray([embedding], dtype=np.float32),
+            embedding_column=embedding_column,
+            columns=columns,
+            limit=limit,
+            quantization=quantization,
+            candidates=candidates,
+            ef_search=ef_search,
+        )
+        return results[0]
+
+    async def nearest_by_embeddings(
+        self,
+        embeddings: np.ndarray,
+        embedding_column: InstrumentedAttribute,
+        columns: List[InstrumentedAttribute],
+        limit: int = 10,
+        quantization: Optional[str] = None,
+        candidates: Optional[int] = None,
+        ef_search: Optional[int] = None,
+    ) -> List[List[Row]]:
+        if len(embeddings) == 0:
+            return []
+
+        statement = Service._nearest_statement(
+            embeddings=embeddings,
+            embedding_column=embedding_column,
+            columns=columns,
+            limit=limit,
+            quantization=quantization,
+            candidates=candidates,
+        )
+
+        async with AsyncSession(self.engine) as session:
+            await self._set_ef_search(session=session, ef_search=ef_search)
+            result = await session.execute(statement)
+            rows = result.all()
+        return Service._group_nearest(rows=rows, query_count=len(embeddings))
+
+    async def sync_enum(
+        self, enum: Type[Enum], model: Type[T], column: InstrumentedAttribute
+    ) -> None:
+        async with AsyncSession(self.engine) as session:
+            result = await session.execute(select(model))
+            existing_rows = result.scalars().all()
+            existing_values = {getattr(row, column.key) for row in existing_rows}
+
+            enum_values = {e.value for e in enum}
+
+            for value in enum_values - existing_values:
+                session.add(model(**{column.key: value}))
+
+            for row in existing_rows:
+                if getattr(row, column.key) not in enum_values:
+                    await session.delete(row)
+
+            await session.commit()
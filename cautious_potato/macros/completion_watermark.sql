@@ -0,0 +1,3 @@
+{% macro completion_watermark(column) %}
+(SELECT COALESCE(MAX({{ column }}), '-infinity') FROM {{ this }}) - INTERVAL '{{ var("completion_lookback") }}'
+{% endmacro %}
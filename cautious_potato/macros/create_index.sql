@@ -0,0 +1,3 @@
+{% macro create_index(relation, column) %}
+CREATE INDEX IF NOT EXISTS {{ relation.identifier }}_{{ column }}_idx ON {{ relation }} ({{ column }})
+{% endmacro %}
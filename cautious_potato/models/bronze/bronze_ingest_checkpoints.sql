@@ -0,0 +1,2 @@
+SELECT * 
+FROM ingest_checkpoints
\ No newline at end of file
@@ -1,6 +1,29 @@
-SELECT 
-    SUM(amount) AS total_spent, 
-    COUNT(*) AS transactions, 
-    category
+-- Incremental runs recompute the totals of the categories with transactions
+-- from statements completed since last_completed_at, less the lookback window,
+-- so reloading a statement replaces its totals rather than adding them twice
+
+{{
+    config(
+        unique_key='category',
+        post_hook=["{{ create_index(this, 'category') }}"]
+    )
+}}
+
+{% if is_incremental() %}
+WITH touched AS (
+    SELECT DISTINCT category
+    FROM {{ ref('silver_transactions') }}
+    WHERE statement_completed_at > {{ completion_watermark('last_completed_at') }}
+)
+{% endif %}
+
+SELECT
+    SUM(amount) AS total_spent,
+    COUNT(*) AS transactions,
+    category,
+    MAX(statement_completed_at) AS last_completed_at
 FROM {{ ref('silver_transactions') }}
-GROUP BY category
\ No newline at end of file
+{% if is_incremental() %}
+WHERE category IN (SELECT category FROM touched)
+{% endif %}
+GROUP BY category
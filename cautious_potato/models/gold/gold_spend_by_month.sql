@@ -1,16 +1,53 @@
+-- Incremental runs recompute the totals of the months and categories with transactions
+-- from statements completed since last_completed_at, less the lookback window,
+-- so reloading a statement replaces its totals rather than adding them twice
+
+{{
+    config(
+        unique_key=['month', 'category'],
+        post_hook=[
+            "{{ create_index(this, 'month') }}",
+            "{{ create_index(this, 'category') }}",
+        ]
+    )
+}}
+
 WITH base AS (
     SELECT
         DATE_TRUNC('month', transaction_date) AS month,
         category,
-        amount
+        amount,
+        statement_completed_at
     FROM {{ ref('silver_credits') }}
+),
+
+{% if is_incremental() %}
+touched AS (
+    SELECT DISTINCT month, category
+    FROM base
+    WHERE statement_completed_at > {{ completion_watermark('last_completed_at') }}
+),
+{% endif %}
+
+totals AS (
+    SELECT
+        month,
+        category,
+        SUM(amount) AS total_spent,
+        COUNT(*) AS transactions,
+        MAX(statement_completed_at) AS last_completed_at
+    FROM base
+    {% if is_incremental() %}
+    WHERE (month, category) IN (SELECT month, category FROM touched)
+    {% endif %}
+    GROUP BY month, category
 )
 
 SELECT
     month,
     category,
-    SUM(amount) AS total_spent,
-    COUNT(*) AS transactions
-FROM base
-GROUP BY month, category
+    total_spent,
+    transactions,
+    last_completed_at
+FROM totals
 ORDER BY month
@@ -1,3 +1,19 @@
+{{
+    config(
+        unique_key='id',
+        post_hook=[
+            "{{ create_index(this, 'id') }}",
+            "{{ create_index(this, 'transaction_date') }}",
+            "{{ create_index(this, 'category') }}",
+            "{{ create_index(this, 'statement_id') }}",
+            "{{ create_index(this, 'statement_completed_at') }}",
+        ]
+    )
+}}
+
 SELECT *
 FROM {{ ref('silver_transactions') }}
-WHERE amount > 0
\ No newline at end of file
+WHERE amount > 0
+{% if is_incremental() %}
+    AND statement_completed_at > {{ completion_watermark('statement_completed_at') }}
+{% endif %}
@@ -1,10 +1,25 @@
 -- We do not remove duplicates here in the chance that you could have generated two statements on the same day
 -- For example, one in the morning and one in the evening
 -- We handle deduplication at a transaction level
+-- Concurrent workers can commit a lower id after a higher one, so incremental runs load the ids not yet loaded
+
+{{
+    config(
+        unique_key='id',
+        post_hook=["{{ create_index(this, 'id') }}"]
+    )
+}}
 
 SELECT DISTINCT
     id,
     start_date,
     end_date,
     end_date - start_date AS duration
-FROM {{ ref('bronze_statements') }}
+FROM {{ ref('bronze_statements') }} AS statements
+{% if is_incremental() %}
+WHERE NOT EXISTS (
+    SELECT 1
+    FROM {{ this }} AS existing
+    WHERE existing.id = statements.id
+)
+{% endif %}
@@ -4,21 +4,79 @@
 -- This would then mean we processed the same transaction more than once which could be possible in over-lapping windows in bank staments
 -- An example, 3-months vs 6-months
 
-WITH annotated AS (
-SELECT 
-    *,
-    ROW_NUMBER() OVER(PARTITION BY statement_id, transaction_date, description, amount)
+-- The fingerprint is computed at ingest from the date, description, amount and the occurrence within the statement,
+-- so repeats inside one statement differ while the same transaction in an overlapping statement matches.
+-- We keep the first row stored for each fingerprint. Rows ingested before fingerprints existed are kept as they are.
+
+-- The pipeline commits a statement's transactions over several chunks and marks its checkpoint complete after the last one,
+-- so only complete statements are loaded and incremental runs pick up statements completed since the last run.
+-- Statements stored in one transaction have no checkpoint and are complete from when they were created.
+-- Statements in the lookback window are reloaded, so the anti-join skips a row only when another row already has its fingerprint.
+
+{{
+    config(
+        unique_key='id',
+        post_hook=[
+            "{{ create_index(this, 'id') }}",
+            "{{ create_index(this, 'fingerprint') }}",
+            "{{ create_index(this, 'transaction_date') }}",
+            "{{ create_index(this, 'category') }}",
+            "{{ create_index(this, 'statement_id') }}",
+            "{{ create_index(this, 'statement_completed_at') }}",
+        ]
+    )
+}}
+
+WITH completed_statements AS (
+SELECT
+    statements.id AS statement_id,
+    COALESCE(checkpoints.completed_at, statements.created_at, '-infinity') AS statement_completed_at
+FROM {{ ref('bronze_statements') }} AS statements
+LEFT JOIN {{ ref('bronze_ingest_checkpoints') }} AS checkpoints
+    ON checkpoints.statement_id = statements.id
+WHERE checkpoints.id IS NULL
+    OR checkpoints.completed_at IS NOT NULL
+),
+
+new_transactions AS (
+SELECT
+    transactions.*,
+    completed_statements.statement_completed_at
 FROM 
-    {{ ref('bronze_transactions') }}
+    {{ ref('bronze_transactions') }} AS transactions
+JOIN completed_statements
+    ON completed_statements.statement_id = transactions.statement_id
+{% if is_incremental() %}
+WHERE completed_statements.statement_completed_at > {{ completion_watermark('statement_completed_at') }}
+{% endif %}
+),
+
+first_seen AS (
+SELECT MIN(id) AS id
+FROM new_transactions
+GROUP BY COALESCE(fingerprint, CAST(id AS TEXT))
 )
 
-SELECT DISTINCT ON (transaction_date, description, amount, row_number)
-    id,
-    statement_id, 
-    transaction_date,
-    amount, 
-    cleaned_description,
-    category,
-    balance
-FROM annotated
-ORDER BY transaction_date, description, row_number, amount, id ASC
+SELECT
+    new.id,
+    new.statement_id, 
+    new.transaction_date,
+    new.amount, 
+    new.description,
+    new.fingerprint,
+    new.cleaned_description,
+    new.category,
+    new.balance,
+    new.statement_completed_at
+FROM new_transactions AS new
+JOIN first_seen
+    ON first_seen.id = new.id
+{% if is_incremental() %}
+WHERE new.fingerprint IS NULL
+    OR NOT EXISTS (
+        SELECT 1
+        FROM {{ this }} AS existing
+        WHERE existing.fingerprint = new.fingerprint
+            AND existing.id <> new.id
+    )
+{% endif %}
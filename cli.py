@@ -0,0 +1,207 @@
+import argparse
+import os
+from typing import List, Optional
+
+import components
+from embeddings.config import EMBEDDING_INDEX_QUANTIZATION
+
+# Only light modules are imported at the top; each command imports what it needs
+
+
+def _create_tables() -> None:
+    from models.tables import (
+        Category,
+        IngestCheckpoint,
+        IngestChunk,
+        IngestionJob,
+        ParsedStatement,
+        SpendSummary,
+        Statement,
+        Transaction,
+    )
+
+    service = components.get_service()
+    service.create_tables(
+        tables=[
+            Category.__table__,
+            Statement.__table__,
+            Transaction.__table__,
+            ParsedStatement.__table__,
+            SpendSummary.__table__,
+            IngestCheckpoint.__table__,
+            IngestChunk.__table__,
+            IngestionJob.__table__,
+        ]
+    )
+    service.create_hnsw_index(
+        embedding_column=Transaction.description_embedding,
+        quantization=EMBEDDING_INDEX_QUANTIZATION,
+    )
+
+
+def ingest(args: argparse.Namespace) -> None:
+    _create_tables()
+
+    # Already-ingested statements are skipped and partially persisted ones resume from their checkpoint
+    for result in components.get_pipeline().run(file_paths=args.file_paths):
+        print(result)
+
+
+def enqueue(args: argparse.Namespace) -> None:
+    from ingest.worker import enqueue
+
+    _create_tables()
+    enqueue(service=components.get_service(), file_paths=args.file_paths)
+
+
+def worker(args: argparse.Namespace) -> None:
+    from ingest.worker import IngestWorker
+
+    _create_tables()
+    components.preload()
+
+    IngestWorker(
+        service=components.get_service(),
+        pipeline=components.get_pipeline(),
+        concurrency=args.concurrency,
+    ).run(exit_when_empty=args.exit_when_empty)
+
+
+def export(args: argparse.Namespace) -> None:
+    from models.tables import (
+        Category,
+        IngestionJob,
+        ParsedStatement,
+        SpendSummary,
+        Statement,
+        Transaction,
+    )
+
+    models = {
+        m.__tablename__: m
+        for m in (
+            Category,
+            Statement,
+            Transaction,
+            ParsedStatement,
+            SpendSummary,
+            IngestionJob,
+        )
+    }
+    model = models.get(args.table)
+    if model is None:
+        args.error(
+            f"unknown table {args.table!r}, expected one of: {', '.join(models)}"
+        )
+
+    unknown = [c for c in args.columns or [] if c not in model.model_fields]
+    if unknown:
+        args.error(
+            f"unknown columns for {args.table}: {', '.join(unknown)}; "
+            f"expected any of: {', '.join(model.model_fields)}"
+        )
+
+    columns = [getattr(model, c) for c in args.columns] if args.columns else None
+    path = components.get_service().export(
+        model=model,
+        file_name=args.file_name,
+        file_format=args.format,
+        columns=columns,
+        chunk_size=args.chunk_size,
+    )
+    print(path)
+
+
+def reindex(args: argparse.Namespace) -> None:
+    from models.tables import Transaction
+
+    service = components.get_service()
+    service.create_hnsw_index(
+        embedding_column=Transaction.description_embedding,
+        m=args.m,
+        ef_construction=args.ef_construction,
+        quantization=args.quantization,
+        rebuild=True,
+    )
+    if args.spend_summaries:
+        components.get_spend_summaries().rebuild()
+
+
+def sync_enum(args: argparse.Namespace) -> None:
+    from enums.category import CategoryEnum
+    from models.tables import Category
+
+    service = components.get_service()
+    service.create_tables(tables=[Category.__table__])
+    service.sync_enum(enum=CategoryEnum, model=Category, column=Category.name)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Bank statement ingestion")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    ingest_parser = subparsers.add_parser(
+        "ingest", help="Ingest statements in this process"
+    )
+    ingest_parser.add_argument("file_paths", nargs="+")
+    ingest_parser.set_defaults(func=ingest)
+
+    enqueue_parser = subparsers.add_parser(
+        "enqueue", help="Queue statements for the workers"
+    )
+    enqueue_parser.add_argument("file_paths", nargs="+")
+    enqueue_parser.set_defaults(func=enqueue)
+
+    worker_parser = subparsers.add_parser("worker", help="Process queued statements")
+    worker_parser.add_argument(
+        "--concurrency", type=int, default=int(os.getenv("WORKER_CONCURRENCY", "2"))
+    )
+    worker_parser.add_argument(
+        "--exit-when-empty", action="store_true", help="Stop once the queue is empty"
+    )
+    worker_parser.set_defaults(func=worker)
+
+    export_parser = subparsers.add_parser(
+        "export", help="Export a table to CSV or Parquet"
+    )
+    export_parser.add_argument("table", help="Table name, e.g. transactions")
+    export_parser.add_argument("file_name", help="Output path without the extension")
+    export_parser.add_argument("--format", choices=["csv", "parquet"], default="csv")
+    export_parser.add_argument("--columns", nargs="+")
+    export_parser.add_argument("--chunk-size", type=int, default=10_000)
+    # The table and columns can only be checked once the models are imported, so export reports them itself
+    export_parser.set_defaults(func=export, error=export_parser.error)
+
+    reindex_parser = subparsers.add_parser(
+        "reindex", help="Rebuild the HNSW index on the transaction embeddings"
+    )
+    reindex_parser.add_argument("--m", type=int, default=16)
+    reindex_parser.add_argument("--ef-construction", type=int, default=64)
+    reindex_parser.add_argument(
+        "--quantization",
+        choices=["halfvec", "binary"],
+        default=EMBEDDING_INDEX_QUANTIZATION,
+        help="Defaults to EMBEDDING_INDEX_QUANTIZATION, which the categoriser searches with",
+    )
+    reindex_parser.add_argument(
+        "--spend-summaries",
+        action="store_true",
+        help="Also recompute the spend summaries from the transactions",
+    )
+    reindex_parser.set_defaults(func=reindex)
+
+    sync_enum_parser = subparsers.add_parser(
+        "sync-enum", help="Sync the categories table with CategoryEnum"
+    )
+    sync_enum_parser.set_defaults(func=sync_enum)
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = build_parser().parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
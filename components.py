@@ -0,0 +1,160 @@
+import os
+from functools import lru_cache
+from typing import TYPE_CHECKING
+
+from dotenv import load_dotenv
+
+if TYPE_CHECKING:
+    from agent.agent import Agent
+    from agent.agent_chain import AgentChain
+    from agent.response_cache import BaseResponseCache
+    from embeddings.base_embeddings import BaseEmbeddings
+    from extract.extract import Extract
+    from ingest.pipeline import IngestPipeline
+    from ingest.spend_summaries import SpendSummaries
+    from service import Service
+
+load_dotenv()
+
+# Each factory builds its component on the first call and returns the same instance afterwards.
+# Heavy libraries are imported inside the factories, so a command only pays for the components it uses.
+
+
+@lru_cache(maxsize=None)
+def get_service() -> "Service":
+    from service import Service
+
+    return Service(
+        url=None,
+        username=os.getenv("DATABASE_USERNAME"),
+        password=os.getenv("DATABASE_PASSWORD"),
+        host=os.getenv("DATABASE_HOST", "localhost"),
+        port=os.getenv("PORT"),
+        database_name=os.getenv("DATABASE_NAME"),
+    )
+
+
+@lru_cache(maxsize=None)
+def get_spend_summaries() -> "SpendSummaries":
+    from ingest.spend_summaries import SpendSummaries
+
+    return SpendSummaries(service=get_service())
+
+
+@lru_cache(maxsize=None)
+def get_embeddings() -> "BaseEmbeddings":
+    from embeddings.cached_embeddings import CachedEmbeddings
+    from embeddings.config import EMBEDDING_DIMENSION
+    from embeddings.embeddings import Embeddings
+
+    embeddings = Embeddings()
+    if embeddings.dimension != EMBEDDING_DIMENSION:
+        raise ValueError(
+            f"{embeddings.model_name} produces {embeddings.dimension}-d embeddings, "
+            f"but the description_embedding column is {EMBEDDING_DIMENSION}-d"
+        )
+    return CachedEmbeddings(embeddings=embeddings)
+
+
+@lru_cache(maxsize=None)
+def get_extract() -> "Extract":
+    from extract.adaptive_parser import AdaptiveParser
+    from extract.extract import Extract
+
+    return Extract(parsers=[AdaptiveParser()])
+
+
+@lru_cache(maxsize=None)
+def get_response_cache() -> "BaseResponseCache":
+    from agent.response_cache import SQLiteResponseCache
+
+    return SQLiteResponseCache()
+
+
+@lru_cache(maxsize=None)
+def get_parsing_agent() -> "Agent":
+    from agent.agent import Agent
+    from models.inputs import ParsedInformationInputs
+
+    return Agent[ParsedInformationInputs](
+        name="parsing_agent",
+        model_name="gemini-2.0-flash",
+        model_provider="google_genai",
+        prompt=(
+            "You are responsible for extracting transactions from a banking statement. "
+            "Each transaction may include a date, original description, amount, and balance. "
+            "You will be provided with the statement text, taken from the PDF text layer and, for scanned pages, from OCR."
+        ),
+        tools=[],
+        response_format=ParsedInformationInputs,
+        cache=get_response_cache(),
+    )
+
+
+@lru_cache(maxsize=None)
+def get_categorising_agent() -> "Agent":
+    from agent.agent import Agent
+    from models.inputs import CategoryInformationInputs
+
+    return Agent[CategoryInformationInputs](
+        name="categorising_agent",
+        model_name="gemini-2.0-flash",
+        model_provider="google_genai",
+        prompt=(
+            "You are responsible for categorising banking transactions using their description and amount. "
+            "Additionally, return a cleaned and readable version of the original transaction description. "
+            "Tool-usage is highly encouraged. "
+            "Ensure your queries are well-formed and include relevant context, such as the transaction location, to improve search accuracy."
+        ),
+        tools=[],
+        response_format=CategoryInformationInputs,
+        cache=get_response_cache(),
+    )
+
+
+@lru_cache(maxsize=None)
+def get_agent_chain() -> "AgentChain":
+    from agent.agent_chain import AgentChain
+    from embeddings.config import EMBEDDING_INDEX_QUANTIZATION
+    from extract.template_parser import TemplateParser
+    from ingest.neighbour_categoriser import NeighbourCategoriser
+    from ingest.overlap_filter import OverlapFilter
+
+    return AgentChain(
+        parsing_agent=get_parsing_agent(),
+        categorising_agent=get_categorising_agent(),
+        transaction_filter=OverlapFilter(service=get_service()).filter,
+        categorising_chunk_size=50,
+        max_concurrency=4,
+        parsing_token_budget=4000,
+        template_parser=TemplateParser(),
+        category_resolver=NeighbourCategoriser(
+            service=get_service(),
+            embeddings=get_embeddings(),
+            quantization=EMBEDDING_INDEX_QUANTIZATION,
+        ).resolve,
+    )
+
+
+@lru_cache(maxsize=None)
+def get_pipeline() -> "IngestPipeline":
+    from ingest.pipeline import IngestPipeline
+
+    return IngestPipeline(
+        service=get_service(),
+        extract=get_extract(),
+        agent_chain=get_agent_chain(),
+        embeddings=get_embeddings(),
+        spend_summaries=get_spend_summaries(),
+    )
+
+
+def preload() -> None:
+    """
+    Builds every ingestion component and loads the models up front, for long-lived workers
+    that would otherwise pay for it on their first job.
+    """
+    pipeline = get_pipeline()
+    pipeline.embeddings.create_embedding_matrix(["warm up"])
+    get_parsing_agent().agent
+    get_categorising_agent().agent
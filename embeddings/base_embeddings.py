@@ -1,11 +1,26 @@
 from abc import ABC, abstractmethod
-from typing import List
+from typing import List, Optional
+
+import numpy as np
 
 
 class BaseEmbeddings(ABC):
     def __init__(self, model_name: str):
         self.model_name = model_name
 
+    @property
+    def model_id(self) -> str:
+        """
+        Identifies what produced the embeddings, e.g. for cache keys.
+        """
+        return self.model_name
+
     @abstractmethod
     def create_embedding(self, text: str) -> List[float]:
         pass
+
+    @abstractmethod
+    def create_embedding_matrix(
+        self, texts: List[str], batch_size: Optional[int] = None
+    ) -> np.ndarray:
+        pass
@@ -0,0 +1,108 @@
+import argparse
+import random
+import time
+from typing import List, Optional
+
+from embeddings.embeddings import BACKENDS, Embeddings
+
+_MERCHANTS = [
+    "WOOLWORTHS",
+    "CHECKERS HYPER",
+    "PICK N PAY",
+    "UBER TRIP",
+    "ENGEN GARAGE",
+    "NETFLIX.COM",
+    "TAKEALOT",
+    "VODACOM PREPAID",
+]
+_KINDS = ["POS PURCHASE", "DEBIT ORDER", "CARD PURCHASE", "EFT PAYMENT"]
+
+
+def sample_descriptions(count: int, seed: int = 0) -> List[str]:
+    """
+    Synthetic statement descriptions, unique so no duplicates are skipped by the embedding matrix.
+    """
+    rng = random.Random(seed)
+    return [
+        f"{rng.choice(_KINDS)} {rng.choice(_MERCHANTS)} {rng.randint(1000, 9999)} REF{i:06d}"
+        for i in range(count)
+    ]
+
+
+def sentences_per_second(
+    embeddings: Embeddings, texts: List[str], repeats: int = 3
+) -> float:
+    # The first call loads the model and warms up the runtime, so it is not timed
+    embeddings.create_embedding_matrix(texts[: embeddings.batch_size])
+
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        embeddings.create_embedding_matrix(texts)
+        best = min(best, time.perf_counter() - start)
+    return len(texts) / best
+
+
+def benchmark(
+    backends: List[str],
+    count: int = 2000,
+    batch_size: int = 64,
+    num_threads: Optional[int] = None,
+    repeats: int = 3,
+) -> None:
+    """
+    Prints the throughput of each backend and its speed-up and lowest cosine similarity
+    against the fp32 PyTorch model.
+    """
+    texts = sample_descriptions(count)
+    reference = Embeddings(
+        batch_size=batch_size, backend="torch", num_threads=num_threads
+    )
+    baseline = sentences_per_second(reference, texts, repeats=repeats)
+
+    print(f"{'backend':<10} {'sentences/s':>12} {'speed-up':>9} {'min cosine':>11}")
+    print(f"{'torch':<10} {baseline:>12.1f} {1.0:>8.2f}x {1.0:>11.4f}")
+
+    for backend in backends:
+        if backend == "torch":
+            continue
+
+        # The similarity is reported below rather than checked on load
+        embeddings = Embeddings(
+            batch_size=batch_size,
+            backend=backend,
+            num_threads=num_threads,
+            parity_check=False,
+        )
+        try:
+            throughput = sentences_per_second(embeddings, texts, repeats=repeats)
+            similarity = embeddings.check_parity(
+                texts[:256], min_similarity=0.0, reference=reference
+            )
+        except Exception as e:
+            print(f"{backend:<10} skipped: {e.__class__.__name__}: {e}")
+            continue
+
+        print(
+            f"{backend:<10} {throughput:>12.1f} {throughput / baseline:>8.2f}x {similarity:>11.4f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Embedding throughput per backend")
+    parser.add_argument(
+        "--backends", nargs="+", choices=BACKENDS, default=list(BACKENDS)
+    )
+    parser.add_argument("--count", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--num-threads", type=int)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    benchmark(
+        backends=args.backends,
+        count=args.count,
+        batch_size=args.batch_size,
+        num_threads=args.num_threads,
+        repeats=args.repeats,
+    )
@@ -0,0 +1,156 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from embeddings.base_embeddings import BaseEmbeddings
+from embeddings.config import EMBEDDINGS_CACHE_PATH
+
+
+class CachedEmbeddings(BaseEmbeddings):
+    """
+    Content-addressed cache in front of an embeddings model.
+    Embeddings are looked up in a bounded in-memory LRU, then in an on-disk SQLite store,
+    and only the remaining texts are encoded by the wrapped model.
+    """
+
+    def __init__(
+        self,
+        embeddings: BaseEmbeddings,
+        path: Optional[str] = EMBEDDINGS_CACHE_PATH,
+        max_size: int = 10_000,
+    ):
+        self.embeddings = embeddings
+        self.model_name = embeddings.model_name
+        self.max_size = max_size
+
+        self.hits = 0
+        self.misses = 0
+
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._connection = self._connect(path) if path else None
+
+    @property
+    def model_id(self) -> str:
+        return self.embeddings.model_id
+
+    def _connect(self, path: str) -> sqlite3.Connection:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        connection = sqlite3.connect(path, check_same_thread=False)
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS metadata (key TEXT PRIMARY KEY, value TEXT NOT NULL)"
+        )
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, embedding BLOB NOT NULL)"
+        )
+
+        # Entries written by a different model or backend are useless, so drop them when it changes
+        row = connection.execute(
+            "SELECT value FROM metadata WHERE key = 'model_name'"
+        ).fetchone()
+        if row is None or row[0] != self.model_id:
+            connection.execute("DELETE FROM embeddings")
+            connection.execute(
+                "INSERT OR REPLACE INTO metadata (key, value) VALUES ('model_name', ?)",
+                (self.model_id,),
+            )
+        connection.commit()
+        return connection
+
+    @staticmethod
+    def normalise(text: str) -> str:
+        return re.sub(r"\s+", " ", text).strip()
+
+    def _key(self, text: str) -> str:
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        return f"{self.model_id}:{digest}"
+
+    def _remember(self, key: str, embedding: np.ndarray) -> None:
+        self._memory[key] = embedding
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_size:
+            self._memory.popitem(last=False)
+
+    def _lookup(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        found = {}
+        with self._lock:
+            for key in keys:
+                if key in self._memory:
+                    self._memory.move_to_end(key)
+                    found[key] = self._memory[key]
+
+            missing = [key for key in keys if key not in found]
+            if self._connection is not None and missing:
+                placeholders = ",".join("?" for _ in missing)
+                rows = self._connection.execute(
+                    f"SELECT key, embedding FROM embeddings WHERE key IN ({placeholders})",
+                    missing,
+                ).fetchall()
+                for key, blob in rows:
+                    embedding = np.frombuffer(blob, dtype=np.float32)
+                    found[key] = embedding
+                    self._remember(key, embedding)
+
+            # Counted under the lock, as one instance is shared by the pipeline's worker threads
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def _store(self, embeddings: Dict[str, np.ndarray]) -> None:
+        with self._lock:
+            for key, embedding in embeddings.items():
+                self._remember(key, embedding)
+
+            if self._connection is not None:
+                self._connection.executemany(
+                    "INSERT OR REPLACE INTO embeddings (key, embedding) VALUES (?, ?)",
+                    [(key, e.tobytes()) for key, e in embeddings.items()],
+                )
+                self._connection.commit()
+
+    def create_embedding(self, text: str) -> List[float]:
+        return self.create_embedding_matrix([text])[0].tolist()
+
+    def create_embedding_matrix(
+        self, texts: List[str], batch_size: Optional[int] = None
+    ) -> np.ndarray:
+        normalised = [self.normalise(t) for t in texts]
+        keys = {text: self._key(text) for text in normalised}
+
+        found = self._lookup(list(dict.fromkeys(keys.values())))
+        missing = [text for text, key in keys.items() if key not in found]
+
+        if missing:
+            encoded = self.embeddings.create_embedding_matrix(
+                missing, batch_size=batch_size
+            )
+            new = {keys[text]: row.copy() for text, row in zip(missing, encoded)}
+            self._store(new)
+            found.update(new)
+
+        if not normalised:
+            return self.embeddings.create_embedding_matrix([])
+
+        return np.ascontiguousarray(
+            np.stack([found[keys[text]] for text in normalised]), dtype=np.float32
+        )
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "memory_size": len(self._memory),
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            if self._connection is not None:
+                self._connection.execute("DELETE FROM embeddings")
+                self._connection.commit()
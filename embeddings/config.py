@@ -0,0 +1,48 @@
+import os
+
+# On-disk caches, resolved against the repository rather than the directory the process starts in
+CACHE_DIR = os.getenv(
+    "CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache"),
+)
+EMBEDDINGS_CACHE_PATH = os.path.join(CACHE_DIR, "embeddings_cache.sqlite")
+
+# Known output dimensions, so table definitions do not need to load the model to size the vector column
+EMBEDDING_DIMENSIONS = {
+    "sentence-transformers/all-MiniLM-L6-v2": 384,
+    "sentence-transformers/all-MiniLM-L12-v2": 384,
+    "sentence-transformers/all-mpnet-base-v2": 768,
+}
+
+EMBEDDING_MODEL_NAME = os.getenv(
+    "EMBEDDING_MODEL_NAME", "sentence-transformers/all-MiniLM-L6-v2"
+)
+EMBEDDING_DIMENSION = int(
+    os.getenv("EMBEDDING_DIMENSION") or EMBEDDING_DIMENSIONS[EMBEDDING_MODEL_NAME]
+)
+
+# "vector" stores full-precision float32 embeddings, "halfvec" stores float16 to halve table and index size
+EMBEDDING_STORAGE = os.getenv("EMBEDDING_STORAGE", "vector")
+
+# HNSW index over the transaction embeddings: unset indexes the column itself, "halfvec" or "binary" a quantized copy.
+# Neighbour searches use the same setting, since a search only uses the index built for its quantization
+EMBEDDING_INDEX_QUANTIZATION = os.getenv("EMBEDDING_INDEX_QUANTIZATION") or None
+
+# Inference backend for Embeddings: "torch" (fp32), "onnx", "onnx-int8" (dynamically quantized ONNX) or "openvino"
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "torch")
+EMBEDDING_NUM_THREADS = (
+    int(os.getenv("EMBEDDING_NUM_THREADS"))
+    if os.getenv("EMBEDDING_NUM_THREADS")
+    else None
+)
+
+# Other backends are compared with the fp32 PyTorch model and refused below a cosine similarity of 0.99,
+# or 0.97 for "onnx-int8", whose quantization error typically leaves it around 0.97-0.99.
+# EMBEDDING_MIN_SIMILARITY overrides both
+EMBEDDING_MIN_SIMILARITY = (
+    float(os.getenv("EMBEDDING_MIN_SIMILARITY"))
+    if os.getenv("EMBEDDING_MIN_SIMILARITY")
+    else None
+)
+# The comparison loads the PyTorch model, so its result is kept per model and export and only run once
+EMBEDDINGS_PARITY_PATH = os.path.join(CACHE_DIR, "embeddings_parity.sqlite")
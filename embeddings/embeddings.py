@@ -1,23 +1,275 @@
-from typing import Dict, List
-from sentence_transformers import SentenceTransformer
+import os
+import platform
+import sqlite3
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
 
 from embeddings.base_embeddings import BaseEmbeddings
+from embeddings.config import (
+    EMBEDDING_BACKEND,
+    EMBEDDING_MIN_SIMILARITY,
+    EMBEDDING_MODEL_NAME,
+    EMBEDDING_NUM_THREADS,
+    EMBEDDINGS_PARITY_PATH,
+)
+
+BACKENDS = ("torch", "onnx", "onnx-int8", "openvino")
+
+# int8 quantization costs some accuracy, so it is held to a lower bar than the full-precision exports
+MIN_SIMILARITIES = {"onnx-int8": 0.97}
+
+# Statement-like descriptions the other backends are checked on when they load
+PARITY_TEXTS = [
+    "POS PURCHASE WOOLWORTHS 1234",
+    "DEBIT ORDER NETFLIX.COM",
+    "CARD PURCHASE UBER TRIP",
+    "EFT PAYMENT SALARY ACME LTD",
+    "CASH WITHDRAWAL ATM ROSEBANK",
+    "MONTHLY ACCOUNT FEE",
+]
 
 
 class Embeddings(BaseEmbeddings):
-    def __init__(self, model_name: str = "sentence-transformers/all-MiniLM-L6-v2"):
+    """
+    sentence-transformers model on a selectable CPU inference backend.
+    "torch" runs the fp32 PyTorch model, "onnx" and "openvino" the exported graph, and "onnx-int8"
+    a dynamically quantized ONNX export. `model_file_name` picks a specific export from the model
+    repository. `num_threads` caps the intra-op threads; for "torch" the setting is process-wide.
+
+    Any backend but "torch" is checked against the fp32 PyTorch model when it loads, and refused
+    if the cosine similarity falls below `min_similarity` (by default 0.97 for "onnx-int8", else 0.99).
+    The result is recorded per `model_id` at `parity_path`, so the PyTorch model is only loaded for the
+    first check; delete the file to check again. `parity_check=False` skips the check.
+    """
+
+    def __init__(
+        self,
+        model_name: str = EMBEDDING_MODEL_NAME,
+        batch_size: int = 64,
+        backend: str = EMBEDDING_BACKEND,
+        num_threads: Optional[int] = EMBEDDING_NUM_THREADS,
+        model_file_name: Optional[str] = None,
+        min_similarity: Optional[float] = EMBEDDING_MIN_SIMILARITY,
+        parity_check: bool = True,
+        parity_path: Optional[str] = EMBEDDINGS_PARITY_PATH,
+    ):
+        if backend not in BACKENDS:
+            raise ValueError(
+                f"Unknown embeddings backend {backend!r}, expected one of {BACKENDS}"
+            )
+
         self.model_name = model_name
-        self.model = SentenceTransformer(self.model_name)
+        self.batch_size = batch_size
+        self.backend = backend
+        self.num_threads = num_threads
+        self.model_file_name = model_file_name
+        self.min_similarity = (
+            min_similarity
+            if min_similarity is not None
+            else MIN_SIMILARITIES.get(backend, 0.99)
+        )
+        self.parity_check = parity_check
+        self.parity_path = parity_path
+
+        self._model = None
+        self._lock = threading.Lock()
+
+    @property
+    def model(self):
+        # Importing torch and loading the weights takes seconds, so it waits until the first encode
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    model = self._load()
+                    if self.backend != "torch" and self.parity_check:
+                        # Checked before it is published, so nothing is encoded with a model that fails it
+                        self._check_parity_on_load(model)
+                    self._model = model
+        return self._model
+
+    def _file_name(self) -> Optional[str]:
+        if self.model_file_name or self.backend != "onnx-int8":
+            return self.model_file_name
+
+        # The quantized exports published with the sentence-transformers models, per instruction set
+        if platform.machine().lower() in ("arm64", "aarch64"):
+            return "onnx/model_qint8_arm64.onnx"
+        return "onnx/model_quint8_avx2.onnx"
+
+    def _load(self):
+        from sentence_transformers import SentenceTransformer
+
+        model_kwargs = {}
+        file_name = self._file_name()
+        if file_name:
+            model_kwargs["file_name"] = file_name
+
+        if self.num_threads and self.backend == "torch":
+            import torch
+
+            torch.set_num_threads(self.num_threads)
+        elif self.num_threads and self.backend == "openvino":
+            model_kwargs["ov_config"] = {"INFERENCE_NUM_THREADS": str(self.num_threads)}
+        elif self.num_threads:
+            import onnxruntime
+
+            session_options = onnxruntime.SessionOptions()
+            session_options.intra_op_num_threads = self.num_threads
+            session_options.inter_op_num_threads = 1
+            model_kwargs["session_options"] = session_options
+
+        return SentenceTransformer(
+            self.model_name,
+            backend="onnx" if self.backend == "onnx-int8" else self.backend,
+            model_kwargs=model_kwargs or None,
+        )
+
+    @property
+    def model_id(self) -> str:
+        # Other backends produce slightly different vectors, so they must not share cached ones
+        if self.backend == "torch" and not self.model_file_name:
+            return self.model_name
+        return f"{self.model_name}@{self.backend}:{self._file_name() or 'default'}"
+
+    @property
+    def dimension(self) -> int:
+        return self.model.get_sentence_embedding_dimension()
 
     def create_embedding(self, text: str) -> List[float]:
         embedding = self.model.encode(text, convert_to_numpy=False).tolist()
         return embedding
 
+    def create_embedding_matrix(
+        self, texts: List[str], batch_size: Optional[int] = None
+    ) -> np.ndarray:
+        """
+        Encodes all texts in a single batched call and returns a contiguous float32 matrix
+        with one row per input text. Duplicate texts are only encoded once.
+        """
+        return self._encode_matrix(self.model, texts, batch_size=batch_size)
+
+    def _encode_matrix(
+        self, model, texts: List[str], batch_size: Optional[int] = None
+    ) -> np.ndarray:
+        unique_texts = list(dict.fromkeys(texts))
+        if not unique_texts:
+            return np.empty(
+                (0, model.get_sentence_embedding_dimension()), dtype=np.float32
+            )
+
+        unique_embeddings = model.encode(
+            unique_texts,
+            batch_size=batch_size or self.batch_size,
+            convert_to_numpy=True,
+        )
+
+        positions = {text: index for index, text in enumerate(unique_texts)}
+        indices = np.fromiter((positions[t] for t in texts), dtype=np.intp)
+
+        return np.ascontiguousarray(unique_embeddings[indices], dtype=np.float32)
+
     def create_embeddings(self, texts: List[str]) -> Dict[str, List[float]]:
-        return {t: self.create_embedding(t) for t in texts}
+        matrix = self.create_embedding_matrix(texts)
+        return {t: row.tolist() for t, row in zip(texts, matrix)}
+
+    def check_parity(
+        self,
+        texts: List[str],
+        min_similarity: Optional[float] = None,
+        reference: Optional["Embeddings"] = None,
+    ) -> float:
+        """
+        Compares this backend against the fp32 PyTorch model (or `reference`) on `texts` and returns
+        the lowest cosine similarity between matching embeddings. Raises ValueError below `min_similarity`
+        (by default this model's), since stored embeddings from different backends are searched together.
+        """
+        if not texts:
+            raise ValueError("check_parity needs at least one text to compare")
+
+        reference = reference or self._reference()
+        lowest = self._lowest_similarity(self.model, texts, reference)
+        self._require_similarity(
+            lowest,
+            self.min_similarity if min_similarity is None else min_similarity,
+            reference.model_id,
+        )
+        return lowest
+
+    def _reference(self) -> "Embeddings":
+        return Embeddings(
+            model_name=self.model_name, batch_size=self.batch_size, backend="torch"
+        )
+
+    def _check_parity_on_load(self, model) -> None:
+        reference = self._reference()
+
+        lowest = self._recorded_similarity()
+        if lowest is None:
+            lowest = self._lowest_similarity(model, PARITY_TEXTS, reference)
+            # Recorded even when it fails, so changing the threshold does not need the PyTorch model again
+            self._record_similarity(lowest)
+        self._require_similarity(lowest, self.min_similarity, reference.model_id)
+
+    def _lowest_similarity(
+        self, model, texts: List[str], reference: "Embeddings"
+    ) -> float:
+        ours = self._encode_matrix(model, texts)
+        theirs = reference.create_embedding_matrix(texts)
+
+        similarities = np.sum(ours * theirs, axis=1) / (
+            np.linalg.norm(ours, axis=1) * np.linalg.norm(theirs, axis=1)
+        )
+        return float(similarities.min())
+
+    def _require_similarity(
+        self, lowest: float, min_similarity: float, reference_id: str
+    ) -> None:
+        if lowest < min_similarity:
+            raise ValueError(
+                f"{self.model_id} embeddings have a cosine similarity as low as {lowest:.4f} "
+                f"with {reference_id}, below the required {min_similarity}"
+            )
+
+    def _connect_parity(self) -> sqlite3.Connection:
+        os.makedirs(os.path.dirname(os.path.abspath(self.parity_path)), exist_ok=True)
+        connection = sqlite3.connect(self.parity_path)
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS parity (model_id TEXT PRIMARY KEY, similarity REAL NOT NULL)"
+        )
+        return connection
+
+    def _recorded_similarity(self) -> Optional[float]:
+        if not self.parity_path:
+            return None
+
+        connection = self._connect_parity()
+        try:
+            row = connection.execute(
+                "SELECT similarity FROM parity WHERE model_id = ?", (self.model_id,)
+            ).fetchone()
+        finally:
+            connection.close()
+        return row[0] if row else None
+
+    def _record_similarity(self, lowest: float) -> None:
+        if not self.parity_path:
+            return
+
+        connection = self._connect_parity()
+        try:
+            with connection:
+                connection.execute(
+                    "INSERT OR REPLACE INTO parity (model_id, similarity) VALUES (?, ?)",
+                    (self.model_id, lowest),
+                )
+        finally:
+            connection.close()
 
 
 if __name__ == "__main__":
     embeddings = Embeddings()
     object = embeddings.create_embedding("Embed this")
     objects = embeddings.create_embeddings(["Embed this"])
+    matrix = embeddings.create_embedding_matrix(["Embed this", "Embed this"])
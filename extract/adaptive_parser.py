@@ -0,0 +1,63 @@
+import html
+import re
+from typing import List, Optional
+from tika import parser
+
+from extract.parser import Parser
+from extract.pytesseract_ocr import PytesseractOCR
+
+
+class AdaptiveParser(Parser):
+    """
+    Reads the PDF text layer with Tika and only falls back to OCR for pages whose text layer is too sparse.
+    """
+
+    _page_pattern = re.compile(r'<div class="page">')
+    _tag_pattern = re.compile(r"<[^>]+>")
+
+    def __init__(
+        self,
+        ocr: Optional[PytesseractOCR] = None,
+        min_text_density: int = 100,
+    ):
+        self.ocr = ocr or PytesseractOCR()
+        self.min_text_density = min_text_density
+
+    def _text_layer_pages(self, file_path: str) -> List[str]:
+        parsed = parser.from_file(file_path, xmlContent=True)
+        content = parsed.get("content") or ""
+
+        return [
+            html.unescape(self._tag_pattern.sub("", page)).strip()
+            for page in self._page_pattern.split(content)[1:]
+        ]
+
+    @staticmethod
+    def text_density(page: str) -> int:
+        return sum(character.isalnum() for character in page)
+
+    def parse_document(self, file_path: str) -> str:
+        if not file_path.endswith(".pdf"):
+            return self.ocr.parse_document(file_path=file_path)
+
+        pages = self._text_layer_pages(file_path=file_path)
+        if not pages:
+            return self.ocr.parse_document(file_path=file_path)
+
+        sparse_pages = [
+            page_number
+            for page_number, page in enumerate(pages, start=1)
+            if self.text_density(page) < self.min_text_density
+        ]
+
+        if sparse_pages:
+            ocr_pages = self.ocr.parse_pages(
+                pdf_path=file_path, page_numbers=sparse_pages
+            )
+            for page_number, text in ocr_pages.items():
+                pages[page_number - 1] = text
+
+        return "\n\n".join(pages)
+
+    def parse_documents(self, file_paths: List[str]) -> List[str]:
+        return [self.parse_document(file_path=file_path) for file_path in file_paths]
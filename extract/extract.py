@@ -1,14 +1,57 @@
-from typing import List
+import hashlib
+import multiprocessing
+import os
+import signal
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from queue import Empty
+from typing import Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from pydantic import BaseModel
+
 from extract.parser import Parser
 from models.tables import ParsedStatement
 
 
+class ExtractionResult(BaseModel):
+    file_path: str
+    strategy_name: str
+    parsed_statement: Optional[ParsedStatement] = None
+    error: Optional[str] = None
+
+
+_started = None
+
+
+def _init_worker(started) -> None:
+    global _started
+    _started = started
+
+
+def _parse_document(attempt: int, parser: Parser, file_path: str) -> str:
+    # The executor marks queued tasks as running, so the worker reports when it actually starts
+    _started.put((attempt, os.getpid(), time.monotonic()))
+    return parser.parse_document(file_path=file_path)
+
+
 class Extract:
     def __init__(
         self,
         parsers: List[Parser],
+        max_workers: Optional[int] = None,
     ):
         self.parsers = parsers
+        self.max_workers = max_workers
+
+    @staticmethod
+    def file_digest(file_path: str, chunk_size: int = 1 << 20) -> str:
+        digest = hashlib.sha256()
+        with open(file_path, "rb") as file:
+            while chunk := file.read(chunk_size):
+                digest.update(chunk)
+        return digest.hexdigest()
 
     def extract_from_file(self, file_path: str) -> List[ParsedStatement]:
         parsed_statements = []
@@ -20,3 +63,145 @@ class Extract:
             parsed_statements.append(parsed_statement)
 
         return parsed_statements
+
+    def extract_from_files(
+        self,
+        file_paths: List[str],
+        timeout: Optional[float] = None,
+        max_workers: Optional[int] = None,
+    ) -> Iterator[ExtractionResult]:
+        """
+        Fans every (file, parser) pair out over a process pool and yields results as they finish.
+        Failures and tasks running longer than `timeout` seconds, measured from when a worker picks them up,
+        are yielded with `error` set. A parser cannot be interrupted, so on a timeout the pool is torn down:
+        the worker processes still running are killed and the other tasks in flight start again on a new pool.
+        """
+        workers = max_workers or self.max_workers or os.cpu_count() or 1
+        tasks: Deque[Tuple[str, Parser]] = deque(
+            (file_path, parser) for file_path in file_paths for parser in self.parsers
+        )
+        started_queue = multiprocessing.Queue()
+        executor: Optional[ProcessPoolExecutor] = None
+        # Each submission gets its own attempt number, so a late report from a killed worker is not mistaken for a retry
+        pending: Dict[Future, Tuple[int, str, Parser]] = {}
+        started: Dict[int, Tuple[int, float]] = {}
+        attempts = 0
+
+        try:
+            poll_interval = min(timeout, 1.0) if timeout else None
+            while tasks or pending:
+                if executor is None:
+                    executor = ProcessPoolExecutor(
+                        max_workers=workers,
+                        initializer=_init_worker,
+                        initargs=(started_queue,),
+                    )
+
+                # No more tasks than workers are in flight, so each one is picked up as soon as it is submitted
+                while tasks and len(pending) < workers:
+                    file_path, parser = tasks.popleft()
+                    attempts += 1
+                    future = executor.submit(
+                        _parse_document, attempts, parser, file_path
+                    )
+                    pending[future] = (attempts, file_path, parser)
+
+                done, _ = wait(
+                    pending, timeout=poll_interval, return_when=FIRST_COMPLETED
+                )
+                self._drain(started_queue, started, pending.values())
+
+                for future in done:
+                    attempt, file_path, parser = pending.pop(future)
+                    started.pop(attempt, None)
+                    broken = isinstance(future.exception(), BrokenProcessPool)
+                    if broken and executor is not None:
+                        # A worker died; the remaining tasks need a new pool
+                        executor.shutdown(wait=False, cancel_futures=True)
+                        executor = None
+                    yield self._to_result(future, file_path, parser.__class__.__name__)
+
+                if not timeout:
+                    continue
+
+                now = time.monotonic()
+                expired = [
+                    future
+                    for future, (attempt, _, _) in pending.items()
+                    if attempt in started and now - started[attempt][1] > timeout
+                ]
+                if not expired:
+                    continue
+
+                for future in expired:
+                    _, file_path, parser = pending.pop(future)
+                    yield ExtractionResult(
+                        file_path=file_path,
+                        strategy_name=parser.__class__.__name__,
+                        error=f"Timed out after {timeout} seconds",
+                    )
+
+                self._terminate(executor, started)
+                tasks.extendleft(
+                    (file_path, parser)
+                    for _, file_path, parser in reversed(list(pending.values()))
+                )
+                pending.clear()
+                started.clear()
+                executor = None
+        finally:
+            if executor is not None:
+                self._terminate(executor, started)
+            started_queue.close()
+
+    @staticmethod
+    def _drain(
+        started_queue,
+        started: Dict[int, Tuple[int, float]],
+        in_flight: Iterable[Tuple[int, str, Parser]],
+    ) -> None:
+        # A report can arrive after its task finished, and the worker that sent it may already be idle;
+        # recording it would get that worker killed, possibly while it holds the pool's call queue lock
+        attempts = {attempt for attempt, _, _ in in_flight}
+        while True:
+            try:
+                attempt, pid, start = started_queue.get_nowait()
+            except Empty:
+                return
+            if attempt in attempts:
+                started[attempt] = (pid, start)
+
+    @staticmethod
+    def _terminate(
+        executor: ProcessPoolExecutor, started: Dict[int, Tuple[int, float]]
+    ) -> None:
+        """
+        Shuts the pool down without waiting and kills the workers of the tasks that are still running.
+        """
+        executor.shutdown(wait=False, cancel_futures=True)
+        for pid, _ in started.values():
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    @staticmethod
+    def _to_result(
+        future: Future, file_path: str, strategy_name: str
+    ) -> ExtractionResult:
+        try:
+            parsed_result = future.result()
+        except Exception as e:
+            return ExtractionResult(
+                file_path=file_path,
+                strategy_name=strategy_name,
+                error=f"{e.__class__.__name__}: {e}",
+            )
+
+        return ExtractionResult(
+            file_path=file_path,
+            strategy_name=strategy_name,
+            parsed_statement=ParsedStatement(
+                strategy_name=strategy_name, strategy_result=parsed_result
+            ),
+        )
@@ -1,28 +1,108 @@
-from typing import List
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, Optional
 from PIL import Image
-from pdf2image import convert_from_path
+from pdf2image import convert_from_path, pdfinfo_from_path
 import pytesseract
 
 from extract.parser import Parser
 
 
 class PytesseractOCR(Parser):
-    def __init__(self):
-        pass
+    def __init__(
+        self,
+        stream: bool = True,
+        dpi: int = 200,
+        grayscale: bool = True,
+        window_size: Optional[int] = None,
+        max_workers: Optional[int] = None,
+    ):
+        self.stream = stream
+        self.dpi = dpi
+        self.grayscale = grayscale
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.window_size = window_size or self.max_workers
 
-    def _convert_from_path(self, pdf_path: str):
-        return convert_from_path(pdf_path=pdf_path)
+    def _convert_from_path(
+        self,
+        pdf_path: str,
+        first_page: Optional[int] = None,
+        last_page: Optional[int] = None,
+    ):
+        return convert_from_path(
+            pdf_path=pdf_path,
+            dpi=self.dpi,
+            grayscale=self.grayscale,
+            first_page=first_page,
+            last_page=last_page,
+        )
+
+    def _page_count(self, pdf_path: str) -> int:
+        return pdfinfo_from_path(pdf_path)["Pages"]
+
+    def _iter_page_windows(
+        self, pdf_path: str, first_page: int = 1, last_page: Optional[int] = None
+    ) -> Iterator[List[Image.Image]]:
+        """
+        Rasterizes the PDF `window_size` pages at a time so only one window of images is held in memory.
+        """
+        last_page = last_page or self._page_count(pdf_path=pdf_path)
+        for window_start in range(first_page, last_page + 1, self.window_size):
+            window_end = min(window_start + self.window_size - 1, last_page)
+            yield self._convert_from_path(
+                pdf_path=pdf_path, first_page=window_start, last_page=window_end
+            )
 
     def _image_to_string(self, page: Image):
         return pytesseract.image_to_string(page)
 
+    def _stream_pdf(self, pdf_path: str) -> List[str]:
+        page_texts = []
+        # pytesseract shells out to the tesseract binary, so threads OCR pages in parallel
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for pages in self._iter_page_windows(pdf_path=pdf_path):
+                page_texts.extend(executor.map(self._image_to_string, pages))
+                for page in pages:
+                    page.close()
+        return page_texts
+
+    def parse_pages(self, pdf_path: str, page_numbers: List[int]) -> Dict[int, str]:
+        """
+        OCRs only the given (1-indexed) pages of a PDF, rasterizing each contiguous run of pages in windows.
+        """
+        page_numbers = sorted(set(page_numbers))
+        runs: List[List[int]] = []
+        for page_number in page_numbers:
+            if runs and page_number == runs[-1][-1] + 1:
+                runs[-1].append(page_number)
+            else:
+                runs.append([page_number])
+
+        page_texts = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for run in runs:
+                windows = self._iter_page_windows(
+                    pdf_path=pdf_path, first_page=run[0], last_page=run[-1]
+                )
+                page_number = run[0]
+                for pages in windows:
+                    for text in executor.map(self._image_to_string, pages):
+                        page_texts[page_number] = text
+                        page_number += 1
+                    for page in pages:
+                        page.close()
+        return page_texts
+
     def parse_document(self, file_path: str):
-        if file_path.endswith(".pdf"):
-            pages = self._convert_from_path(pdf_path=file_path)
-        elif file_path.endswith((".jpeg", ".png")):
-            pages = [Image.open(fp=file_path)]
+        if file_path.endswith(".pdf") and self.stream:
+            page_texts = self._stream_pdf(pdf_path=file_path)
+        else:
+            if file_path.endswith(".pdf"):
+                pages = self._convert_from_path(pdf_path=file_path)
+            elif file_path.endswith((".jpeg", ".png")):
+                pages = [Image.open(fp=file_path)]
 
-        page_texts = [self._image_to_string(page) for page in pages]
+            page_texts = [self._image_to_string(page) for page in pages]
 
         page_texts = "\n\n".join(page_texts)
 
@@ -31,6 +111,6 @@ class PytesseractOCR(Parser):
     def parse_documents(self, file_paths: List[str]) -> List[str]:
         documents_text = []
         for file_path in file_paths:
-            pages = self.scan_document(file_path=file_path)
+            pages = self.parse_document(file_path=file_path)
             documents_text.append(pages)
         return documents_text
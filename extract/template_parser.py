@@ -0,0 +1,191 @@
+import re
+from datetime import date, datetime
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+from models.information import ParsedInformation, TrackedParsedInformation
+from models.inputs import ParsedInformationInputs
+
+_AMOUNT = r"-?\(?\d[\d,]*\.\d{2}\)?(?:\s?(?:Cr|Dr|CR|DR))?-?"
+_ISO_DATE = r"\d{4}[/-]\d{2}[/-]\d{2}"
+_DAY_MONTH_YEAR = r"\d{1,2} [A-Za-z]{3} \d{4}"
+_BALANCE_LINES = (
+    r"(?i)\b(?:opening|closing) balance\b|\bbalance (?:brought|carried) forward\b"
+)
+
+
+_OPENING_BALANCE = (
+    rf"(?i)\b(?:opening balance|balance brought forward)\b.*?\s(?P<balance>{_AMOUNT})$"
+)
+
+
+class BankProfile(BaseModel):
+    """
+    A fixed statement layout. `row_pattern` is matched against each line and must define
+    the named groups date, description, amount and balance.
+    Every line that starts with `date_pattern` followed by more text must be a row, except lines
+    matching `skip_pattern`, such as the opening balance.
+    `opening_pattern` finds the opening balance, which the first transaction is reconciled against;
+    a statement without one is not parsed. None accepts the first row's amount unchecked.
+    """
+
+    name: str
+    row_pattern: str
+    date_pattern: str
+    date_formats: List[str]
+    skip_pattern: Optional[str] = _BALANCE_LINES
+    opening_pattern: Optional[str] = _OPENING_BALANCE
+    thousands_separator: str = ","
+    min_rows: int = 3
+
+
+DEFAULT_PROFILES = [
+    BankProfile(
+        name="iso_date_amount_balance",
+        row_pattern=(
+            rf"^(?P<date>{_ISO_DATE})\s+(?P<description>.+?)\s+"
+            rf"(?P<amount>{_AMOUNT})\s+(?P<balance>{_AMOUNT})$"
+        ),
+        date_pattern=_ISO_DATE,
+        date_formats=["%Y/%m/%d", "%Y-%m-%d"],
+    ),
+    BankProfile(
+        name="day_month_year_amount_balance",
+        row_pattern=(
+            rf"^(?P<date>{_DAY_MONTH_YEAR})\s+(?P<description>.+?)\s+"
+            rf"(?P<amount>{_AMOUNT})\s+(?P<balance>{_AMOUNT})$"
+        ),
+        date_pattern=_DAY_MONTH_YEAR,
+        date_formats=["%d %b %Y"],
+    ),
+]
+
+
+class TemplateParser:
+    """
+    Deterministic parser for known statement layouts.
+    A result is only returned when every date-led line parses as a row and the rows reconcile
+    with the running balance, so anything it cannot parse reliably is left to the parsing agent.
+    """
+
+    def __init__(
+        self, profiles: Optional[List[BankProfile]] = None, tolerance: float = 0.01
+    ):
+        self.profiles = profiles if profiles is not None else DEFAULT_PROFILES
+        self.tolerance = tolerance
+        self._patterns = {p.name: re.compile(p.row_pattern) for p in self.profiles}
+        self._date_patterns = {
+            p.name: re.compile(rf"{p.date_pattern}\s+\S") for p in self.profiles
+        }
+        self._skip_patterns = {
+            p.name: re.compile(p.skip_pattern) for p in self.profiles if p.skip_pattern
+        }
+        self._opening_patterns = {
+            p.name: re.compile(p.opening_pattern)
+            for p in self.profiles
+            if p.opening_pattern
+        }
+
+    @staticmethod
+    def _to_float(value: str, profile: BankProfile) -> float:
+        value = value.strip()
+        negative = value.startswith("-") or value.endswith("-")
+        negative = negative or (value.startswith("(") and value.endswith(")"))
+        negative = negative or value.upper().endswith("DR")
+
+        digits = re.sub(r"(?i)cr|dr|[()\-\s]", "", value)
+        digits = digits.replace(profile.thousands_separator, "")
+
+        amount = float(digits)
+        return -amount if negative else amount
+
+    @staticmethod
+    def _to_date(value: str, profile: BankProfile) -> date:
+        for date_format in profile.date_formats:
+            try:
+                return datetime.strptime(value, date_format).date()
+            except ValueError:
+                continue
+        raise ValueError(f"Unrecognised date {value!r} for profile {profile.name}")
+
+    def _opening_balance(self, text: str, profile: BankProfile) -> Optional[float]:
+        pattern = self._opening_patterns[profile.name]
+        for line in text.splitlines():
+            match = pattern.search(line.strip())
+            if match:
+                return self._to_float(match["balance"], profile)
+        return None
+
+    def _reconciles(
+        self, rows: List[ParsedInformation], opening: Optional[float]
+    ) -> bool:
+        def running(ordered: List[ParsedInformation]) -> bool:
+            # Without the opening balance nothing checks the amount of the oldest row
+            if opening is not None and ordered:
+                first = ordered[0]
+                if abs(opening + first.amount - first.balance) > self.tolerance:
+                    return False
+            return all(
+                abs(previous.balance + current.amount - current.balance)
+                <= self.tolerance
+                for previous, current in zip(ordered, ordered[1:])
+            )
+
+        # Some banks list the newest transaction first
+        return running(rows) or running(rows[::-1])
+
+    def _parse_with(
+        self, text: str, profile: BankProfile
+    ) -> Optional[List[ParsedInformation]]:
+        pattern = self._patterns[profile.name]
+        date_pattern = self._date_patterns[profile.name]
+        skip_pattern = self._skip_patterns.get(profile.name)
+
+        rows = []
+        for line in text.splitlines():
+            line = line.strip()
+            if not date_pattern.match(line):
+                continue
+            if skip_pattern and skip_pattern.search(line):
+                continue
+
+            # A transaction line the row pattern misses, e.g. an amount without decimals, would be dropped
+            # silently and the remaining rows could still reconcile, so the statement goes to the agent instead
+            match = pattern.match(line)
+            if not match:
+                return None
+
+            try:
+                rows.append(
+                    ParsedInformation(
+                        transaction_date=self._to_date(match["date"], profile),
+                        description=match["description"].strip(),
+                        amount=self._to_float(match["amount"], profile),
+                        balance=self._to_float(match["balance"], profile),
+                    )
+                )
+            except ValueError:
+                return None
+
+        opening = None
+        if profile.opening_pattern:
+            opening = self._opening_balance(text, profile)
+            if opening is None:
+                return None
+
+        if len(rows) < profile.min_rows or not self._reconciles(rows, opening):
+            return None
+        return rows
+
+    def parse(self, text: str) -> Optional[ParsedInformationInputs]:
+        for profile in self.profiles:
+            rows = self._parse_with(text=text, profile=profile)
+            if rows is not None:
+                return ParsedInformationInputs(
+                    parsed_information_inputs=[
+                        TrackedParsedInformation(id=str(i), data=row)
+                        for i, row in enumerate(rows)
+                    ]
+                )
+        return None
@@ -0,0 +1,87 @@
+from typing import List, Optional
+
+from sqlalchemy import func, update
+
+from ingest.spend_summaries import SpendSummaries
+from models.tables import IngestCheckpoint, IngestChunk, Statement, Transaction
+from service import Service
+
+
+class CheckpointStore:
+    """
+    Persists a statement for IngestPipeline in chunks: the statement and its checkpoint first,
+    then each chunk of transactions with a marker row, so a resumed run can tell which chunks are stored.
+    """
+
+    def __init__(self, service: Service, spend_summaries: SpendSummaries):
+        self.service = service
+        self.spend_summaries = spend_summaries
+
+    def create(
+        self, statement: Statement, checkpoint: IngestCheckpoint
+    ) -> IngestCheckpoint:
+        """
+        Inserts the statement with its parsed statements, without transactions, and the checkpoint
+        that tracks persisting its transactions chunk by chunk.
+        """
+        with self.service.transaction() as session:
+            self.service.insert_graph(session=session, model=statement)
+
+            checkpoint.statement_id = statement.id
+            self.service.insert_graph(session=session, model=checkpoint)
+
+        return checkpoint
+
+    def create_chunk(
+        self,
+        chunk: IngestChunk,
+        transactions: List[Transaction],
+        batch_size: int = 1000,
+    ) -> Optional[int]:
+        """
+        Inserts one chunk of a checkpointed statement: its transactions, their spend summaries
+        and the chunk marker, in one transaction. Returns the number of transactions inserted,
+        or None, inserting nothing, when the chunk was already persisted.
+
+        The overlap filter runs when a statement is parsed, before anything from it is stored, so
+        overlapping statements in flight at the same time both keep their shared transactions.
+        Those are dropped here instead, on the unique fingerprint, and only the rows actually
+        inserted are added to the spend summaries.
+        """
+        with self.service.transaction() as session:
+            marker = self.service.insert_many(
+                session=session,
+                models=[chunk],
+                conflict_columns=["checkpoint_id", "chunk_index"],
+                returning=[IngestChunk.id],
+            )
+            if not marker:
+                session.rollback()
+                return None
+
+            inserted = self.service.insert_many(
+                session=session,
+                models=transactions,
+                batch_size=batch_size,
+                conflict_columns=["fingerprint"],
+                returning=SpendSummaries.columns,
+            )
+            self.spend_summaries.add(session=session, rows=inserted)
+
+            if len(inserted) != chunk.transactions:
+                session.execute(
+                    update(IngestChunk)
+                    .where(IngestChunk.id == marker[0].id)
+                    .values(transactions=len(inserted))
+                )
+
+        self.spend_summaries.invalidate()
+        return len(inserted)
+
+    def complete(self, checkpoint_id: int) -> None:
+        with self.service.transaction() as session:
+            session.execute(
+                update(IngestCheckpoint)
+                .where(IngestCheckpoint.id == checkpoint_id)
+                .values(completed_at=func.now())
+            )
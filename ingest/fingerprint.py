@@ -0,0 +1,38 @@
+import hashlib
+from collections import Counter
+from datetime import date
+from typing import List
+
+from models.information import ParsedInformation
+
+
+def fingerprint(
+    transaction_date: date, description: str, amount: float, occurrence: int
+) -> str:
+    """
+    Identifies a transaction across overlapping statements.
+    `occurrence` is the 1-based ordinal of identical (date, description, amount) rows within one statement,
+    so genuine repeats such as two identical fees on the same day keep distinct fingerprints.
+    """
+    payload = f"{transaction_date.isoformat()}|{description}|{amount:.2f}|{occurrence}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def fingerprint_transactions(transactions: List[ParsedInformation]) -> List[str]:
+    """
+    Fingerprints every transaction of a single statement, in order.
+    """
+    occurrences = Counter()
+    fingerprints = []
+    for t in transactions:
+        key = (t.transaction_date, t.description, round(t.amount, 2))
+        occurrences[key] += 1
+        fingerprints.append(
+            fingerprint(
+                transaction_date=t.transaction_date,
+                description=t.description,
+                amount=t.amount,
+                occurrence=occurrences[key],
+            )
+        )
+    return fingerprints
@@ -0,0 +1,80 @@
+from typing import Dict, List, Optional
+
+from embeddings.base_embeddings import BaseEmbeddings
+from models.information import CategoryInformation, TrackedParsedInformation
+from models.tables import Transaction
+from service import Service
+
+
+class NeighbourCategoriser:
+    """
+    Reuses the category of already-stored transactions with near-identical descriptions.
+    A transaction is resolved only when at least `min_neighbours` of its `k` nearest neighbours
+    are within `min_similarity` and they all agree on the category.
+    """
+
+    def __init__(
+        self,
+        service: Service,
+        embeddings: BaseEmbeddings,
+        k: int = 5,
+        min_similarity: float = 0.92,
+        min_neighbours: int = 2,
+        ef_search: Optional[int] = None,
+        quantization: Optional[str] = None,
+    ):
+        self.service = service
+        self.embeddings = embeddings
+        self.k = k
+        self.min_similarity = min_similarity
+        self.min_neighbours = min_neighbours
+        self.ef_search = ef_search
+        self.quantization = quantization
+
+    def resolve(
+        self, parsed: List[TrackedParsedInformation]
+    ) -> Dict[str, CategoryInformation]:
+        if not parsed:
+            return {}
+
+        description_embeddings = self.embeddings.create_embedding_matrix(
+            [p.data.description for p in parsed]
+        )
+
+        candidates = self.service.nearest_by_embeddings(
+            embeddings=description_embeddings,
+            embedding_column=Transaction.description_embedding,
+            columns=[
+                Transaction.id,
+                Transaction.category,
+                Transaction.cleaned_description,
+            ],
+            limit=self.k,
+            quantization=self.quantization,
+            ef_search=self.ef_search,
+        )
+
+        resolved = {}
+        for p, embedding, nearest in zip(parsed, description_embeddings, candidates):
+            # Keep the embedding so it is not computed again before the transaction is stored
+            p.data.description_embedding = embedding
+
+            neighbours = [n for n in nearest if 1 - n.distance >= self.min_similarity]
+
+            if len(neighbours) < self.min_neighbours:
+                continue
+
+            categories = {n.category for n in neighbours}
+            if len(categories) != 1:
+                continue
+
+            closest = neighbours[0]
+            resolved[p.id] = CategoryInformation(
+                category=closest.category,
+                cleaned_description=closest.cleaned_description,
+                reasoning=(
+                    f"Reused from {len(neighbours)} previously categorised transactions "
+                    f"with similar descriptions (highest similarity {1 - closest.distance:.2f})."
+                ),
+            )
+        return resolved
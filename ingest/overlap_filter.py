@@ -0,0 +1,78 @@
+from collections import Counter, defaultdict
+from datetime import date
+from typing import Dict, List, Tuple
+
+from ingest.fingerprint import fingerprint_transactions
+from models.information import TrackedParsedInformation
+from models.tables import Transaction
+from service import Service
+
+TransactionKey = Tuple[date, str, float]
+
+
+class OverlapFilter:
+    """
+    Drops parsed transactions that were already stored from an earlier, overlapping statement.
+    Rows are matched on their fingerprint, which counts repeats within a statement the same way
+    silver_transactions does, so genuine same-day duplicates are kept.
+    Rows stored before fingerprints existed have none, so the rest are matched against those by count:
+    a transaction is known when one statement holds at least as many rows with the same date,
+    description and amount.
+    """
+
+    def __init__(self, service: Service):
+        self.service = service
+
+    @staticmethod
+    def _key(transaction_date: date, description: str, amount: float) -> TransactionKey:
+        return transaction_date, description, round(amount, 2)
+
+    def _unfingerprinted_counts(self, start_date: date, end_date: date) -> Counter:
+        transactions = self.service.read_where(
+            Transaction,
+            Transaction.fingerprint.is_(None),
+            Transaction.transaction_date >= start_date,
+            Transaction.transaction_date <= end_date,
+        )
+
+        per_statement: Dict[int, Counter] = defaultdict(Counter)
+        for t in transactions:
+            key = self._key(t.transaction_date, t.description, t.amount)
+            per_statement[t.statement_id][key] += 1
+
+        # The same transaction may already be stored under several statements, so take the max, not the sum
+        known = Counter()
+        for counts in per_statement.values():
+            known |= counts
+        return known
+
+    def filter(
+        self, parsed: List[TrackedParsedInformation]
+    ) -> List[TrackedParsedInformation]:
+        if not parsed:
+            return parsed
+
+        fingerprints = fingerprint_transactions([p.data for p in parsed])
+        known = set(
+            self.service.read_values(
+                Transaction.fingerprint,
+                Transaction.fingerprint.in_(set(fingerprints)),
+            )
+        )
+        unmatched = [p for p, f in zip(parsed, fingerprints) if f not in known]
+        if not unmatched:
+            return unmatched
+
+        dates = [p.data.transaction_date for p in unmatched]
+        counts = self._unfingerprinted_counts(
+            start_date=min(dates), end_date=max(dates)
+        )
+
+        new = []
+        for p in unmatched:
+            key = self._key(p.data.transaction_date, p.data.description, p.data.amount)
+            if counts[key] > 0:
+                counts[key] -= 1
+            else:
+                new.append(p)
+        return new
@@ -0,0 +1,502 @@
+import json
+import queue
+import threading
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator, List, Optional, Set
+
+from pydantic import BaseModel
+
+from extract.extract import Extract
+from ingest.checkpoints import CheckpointStore
+from ingest.spend_summaries import SpendSummaries
+from models.information import TrackedParsedInformation, TransactionInformation
+from models.inputs import ParsedInformationInputs
+from models.tables import (
+    IngestCheckpoint,
+    IngestChunk,
+    ParsedStatement,
+    Statement,
+    Transaction,
+)
+from service import Service
+
+if TYPE_CHECKING:
+    # Only annotations; the agent chain pulls in LangGraph and the embeddings numpy
+    from agent.agent_chain import AgentChain
+    from embeddings.base_embeddings import BaseEmbeddings
+
+# Marks the end of a stage's input
+_DONE = object()
+
+
+class IngestResult(BaseModel):
+    file_path: str
+    file_digest: Optional[str] = None
+    status: str
+    statement_id: Optional[int] = None
+    transactions: int = 0
+    error: Optional[str] = None
+
+
+class _Run:
+    """
+    State of one call to IngestPipeline.run, so several runs can share a pipeline.
+    """
+
+    def __init__(self, on_stage: Optional[Callable[[str, str], None]] = None):
+        self.on_stage = on_stage
+        self.results: List[IngestResult] = []
+        self.lock = threading.Lock()
+
+
+class _StatementWork:
+    def __init__(
+        self,
+        run: _Run,
+        file_path: str,
+        file_digest: Optional[str],
+        checkpoint: Optional[IngestCheckpoint] = None,
+        completed_chunks: Optional[Set[int]] = None,
+    ):
+        self.run = run
+        self.file_path = file_path
+        self.file_digest = file_digest
+        self.checkpoint = checkpoint
+        self.completed_chunks = completed_chunks or set()
+
+        self.parsed_statements: List[ParsedStatement] = []
+        self.fingerprints = {}
+        self.remaining = 0
+        self.transactions = 0
+        self.error: Optional[str] = None
+        self.lock = threading.Lock()
+
+
+class _ChunkWork:
+    def __init__(
+        self,
+        statement: _StatementWork,
+        index: int,
+        parsed: List[TrackedParsedInformation],
+    ):
+        self.statement = statement
+        self.index = index
+        self.parsed = parsed
+        self.information: List[TransactionInformation] = []
+        self.transactions: List[Transaction] = []
+
+
+class _Stage:
+    """
+    Runs `func` over the items of `inbox` on `workers` threads and puts everything it yields on `outbox`.
+    The last worker to see the end of the input forwards it to the next stage.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        func: Callable[[object], Optional[Iterable[object]]],
+        workers: int,
+        inbox: queue.Queue,
+        outbox: Optional[queue.Queue],
+        on_error: Callable[[object, Exception], None],
+    ):
+        self.name = name
+        self.func = func
+        self.inbox = inbox
+        self.outbox = outbox
+        self.on_error = on_error
+
+        self._running = workers
+        self._lock = threading.Lock()
+        self._threads = [
+            threading.Thread(target=self._work, name=f"{name}-{i}")
+            for i in range(workers)
+        ]
+
+    def start(self) -> None:
+        for thread in self._threads:
+            thread.start()
+
+    def join(self) -> None:
+        for thread in self._threads:
+            thread.join()
+
+    def _work(self) -> None:
+        while True:
+            item = self.inbox.get()
+            if item is _DONE:
+                # Leave the marker for the other workers of this stage
+                self.inbox.put(_DONE)
+                break
+
+            try:
+                for output in self.func(item) or ():
+                    self.outbox.put(output)
+            except Exception as e:
+                self.on_error(item, e)
+
+        with self._lock:
+            self._running -= 1
+            last = self._running == 0
+        if last and self.outbox is not None:
+            self.outbox.put(_DONE)
+
+
+class IngestPipeline:
+    """
+    Streams statements through extract -> parse -> categorise -> embed -> persist.
+    Every stage runs on its own worker pool and the stages are connected by bounded queues,
+    so a slow stage holds back the ones before it instead of letting work pile up in memory.
+    Extraction runs on a process pool in windows of `extract_window` files, overlapping with the LLM stages.
+
+    Transactions are persisted in checkpointed chunks of `chunk_size`. A statement that failed
+    part-way is resumed on the next run from its missing chunks, without extracting or parsing it again.
+    """
+
+    def __init__(
+        self,
+        service: Service,
+        extract: Extract,
+        agent_chain: "AgentChain",
+        embeddings: "BaseEmbeddings",
+        spend_summaries: Optional[SpendSummaries] = None,
+        chunk_size: int = 200,
+        queue_size: int = 4,
+        extract_window: int = 4,
+        extract_timeout: Optional[float] = None,
+        parse_workers: int = 2,
+        categorise_workers: int = 4,
+        embed_workers: int = 1,
+        persist_workers: int = 1,
+    ):
+        self.service = service
+        self.extract = extract
+        self.agent_chain = agent_chain
+        self.embeddings = embeddings
+        self.checkpoints = CheckpointStore(
+            service=service,
+            spend_summaries=spend_summaries or SpendSummaries(service=service),
+        )
+        self.chunk_size = chunk_size
+        self.queue_size = queue_size
+        self.extract_window = extract_window
+        self.extract_timeout = extract_timeout
+        self.parse_workers = parse_workers
+        self.categorise_workers = categorise_workers
+        self.embed_workers = embed_workers
+        self.persist_workers = persist_workers
+
+    def _record(
+        self, work: _StatementWork, status: str, error: Optional[str] = None
+    ) -> None:
+        result = IngestResult(
+            file_path=work.file_path,
+            file_digest=work.file_digest,
+            status=status,
+            statement_id=work.checkpoint.statement_id if work.checkpoint else None,
+            transactions=work.transactions,
+            error=error,
+        )
+        with work.run.lock:
+            work.run.results.append(result)
+
+    @staticmethod
+    def _notify(work: _StatementWork, stage: str) -> None:
+        if work.run.on_stage is not None:
+            work.run.on_stage(work.file_path, stage)
+
+    def _prepare(
+        self, run: _Run, file_path: str, seen: Set[str]
+    ) -> Optional[_StatementWork]:
+        file_digest = self.extract.file_digest(file_path=file_path)
+        work = _StatementWork(run=run, file_path=file_path, file_digest=file_digest)
+
+        if file_digest in seen:
+            self._record(work, status="skipped")
+            return None
+        seen.add(file_digest)
+
+        checkpoints = self.service.read_where(
+            IngestCheckpoint, IngestCheckpoint.file_digest == file_digest
+        )
+        if checkpoints:
+            work.checkpoint = checkpoints[0]
+            if work.checkpoint.completed_at is not None:
+                self._record(work, status="skipped")
+                return None
+
+            work.completed_chunks = set(
+                self.service.read_values(
+                    IngestChunk.chunk_index,
+                    IngestChunk.checkpoint_id == work.checkpoint.id,
+                )
+            )
+            return work
+
+        # Statements stored in one go, before checkpoints existed, are complete
+        if self.service.exists(column=Statement.file_digest, value=file_digest):
+            self._record(work, status="skipped")
+            return None
+        return work
+
+    def _extract(self, window: List[_StatementWork]) -> Iterator[_StatementWork]:
+        if not window:
+            return
+
+        by_path = {work.file_path: work for work in window}
+        reported = {work.file_path: 0 for work in window}
+
+        for result in self.extract.extract_from_files(
+            file_paths=list(by_path), timeout=self.extract_timeout
+        ):
+            work = by_path[result.file_path]
+            reported[result.file_path] += 1
+
+            if result.error:
+                work.error = work.error or f"{result.strategy_name}: {result.error}"
+            else:
+                work.parsed_statements.append(result.parsed_statement)
+
+            if reported[result.file_path] < len(self.extract.parsers):
+                continue
+
+            if work.error:
+                self._record(work, status="failed", error=work.error)
+            else:
+                yield work
+
+    def _source(self, run: _Run, file_paths: Iterable[str]) -> Iterator[_StatementWork]:
+        seen = set()
+        window = []
+        for file_path in file_paths:
+            try:
+                work = self._prepare(run=run, file_path=file_path, seen=seen)
+            except Exception as e:
+                self._record(
+                    _StatementWork(run=run, file_path=file_path, file_digest=None),
+                    status="failed",
+                    error=f"{e.__class__.__name__}: {e}",
+                )
+                continue
+
+            if work is None:
+                continue
+
+            # Resumed statements were parsed already, so they skip extraction
+            if work.checkpoint is not None:
+                yield work
+                continue
+
+            self._notify(work, "extract")
+            window.append(work)
+            if len(window) >= self.extract_window:
+                yield from self._extract(window)
+                window = []
+
+        yield from self._extract(window)
+
+    def _checkpoint(self, work: _StatementWork) -> IngestCheckpoint:
+        parsed = self.agent_chain.parse(work.parsed_statements)
+        parsed = parsed.parsed_information_inputs
+        if not parsed:
+            raise ValueError("No transactions were parsed from the statement")
+
+        pending, fingerprints = self.agent_chain.filter(parsed)
+
+        # The date range covers every parsed transaction, including the ones already stored
+        dates = [p.data.transaction_date for p in parsed]
+        statement = Statement(
+            start_date=min(dates),
+            end_date=max(dates),
+            file_digest=work.file_digest,
+            parsed_statements=work.parsed_statements,
+        )
+
+        checkpoint = IngestCheckpoint(
+            file_digest=work.file_digest,
+            file_path=work.file_path,
+            pending=ParsedInformationInputs(
+                parsed_information_inputs=pending
+            ).model_dump_json(),
+            fingerprints=json.dumps({p.id: fingerprints[p.id] for p in pending}),
+            chunk_size=self.chunk_size,
+            total_chunks=-(-len(pending) // self.chunk_size),
+        )
+        return self.checkpoints.create(statement=statement, checkpoint=checkpoint)
+
+    def _parse(self, work: _StatementWork) -> Iterator[_ChunkWork]:
+        self._notify(work, "parse")
+        if work.checkpoint is None:
+            work.checkpoint = self._checkpoint(work)
+            work.parsed_statements = []
+
+        checkpoint = work.checkpoint
+        pending = ParsedInformationInputs.model_validate_json(checkpoint.pending)
+        pending = pending.parsed_information_inputs
+        work.fingerprints = json.loads(checkpoint.fingerprints)
+
+        # Chunks are cut with the checkpoint's chunk size, so a resumed run lines up with the stored ones
+        chunks = [
+            _ChunkWork(
+                statement=work,
+                index=index,
+                parsed=pending[start : start + checkpoint.chunk_size],
+            )
+            for index, start in enumerate(range(0, len(pending), checkpoint.chunk_size))
+            if index not in work.completed_chunks
+        ]
+
+        work.remaining = len(chunks)
+        if not chunks:
+            self._finish_statement(work)
+            return
+
+        self._notify(work, "categorise")
+        yield from chunks
+
+    def _categorise(self, chunk: _ChunkWork) -> Iterator[_ChunkWork]:
+        if chunk.statement.error:
+            self._finish_chunk(chunk)
+            return
+
+        categorised = self.agent_chain.categorise(chunk.parsed)
+        chunk.information = self.agent_chain.consolidate(
+            parsed=chunk.parsed,
+            categorised=categorised,
+            fingerprints=chunk.statement.fingerprints,
+        )
+        chunk.parsed = []
+        yield chunk
+
+    def _embed(self, chunk: _ChunkWork) -> Iterator[_ChunkWork]:
+        if chunk.statement.error:
+            self._finish_chunk(chunk)
+            return
+
+        transactions = [Transaction.model_validate(t) for t in chunk.information]
+        for transaction in transactions:
+            transaction.statement_id = chunk.statement.checkpoint.statement_id
+
+        # Only the descriptions not already embedded during categorisation
+        unembedded = [t for t in transactions if t.description_embedding is None]
+        description_embeddings = self.embeddings.create_embedding_matrix(
+            [transaction.description for transaction in unembedded]
+        )
+        for transaction, embedding in zip(unembedded, description_embeddings):
+            transaction.description_embedding = embedding
+
+        chunk.information = []
+        chunk.transactions = transactions
+        yield chunk
+
+    def _persist(self, chunk: _ChunkWork) -> None:
+        if not chunk.statement.error:
+            created = self.checkpoints.create_chunk(
+                chunk=IngestChunk(
+                    checkpoint_id=chunk.statement.checkpoint.id,
+                    chunk_index=chunk.index,
+                    transactions=len(chunk.transactions),
+                ),
+                transactions=chunk.transactions,
+            )
+            if created is not None:
+                with chunk.statement.lock:
+                    chunk.statement.transactions += created
+
+        chunk.transactions = []
+        self._finish_chunk(chunk)
+
+    def _finish_chunk(self, chunk: _ChunkWork) -> None:
+        work = chunk.statement
+        with work.lock:
+            work.remaining -= 1
+            finished = work.remaining == 0
+        if finished:
+            self._finish_statement(work)
+
+    def _finish_statement(self, work: _StatementWork) -> None:
+        if work.error:
+            self._record(work, status="failed", error=work.error)
+            return
+
+        try:
+            self.checkpoints.complete(checkpoint_id=work.checkpoint.id)
+        except Exception as e:
+            self._record(work, status="failed", error=f"{e.__class__.__name__}: {e}")
+            return
+        self._record(work, status="completed")
+
+    def _on_error(self, item, e: Exception) -> None:
+        work = item.statement if isinstance(item, _ChunkWork) else item
+        with work.lock:
+            work.error = work.error or f"{e.__class__.__name__}: {e}"
+
+        if isinstance(item, _ChunkWork):
+            self._finish_chunk(item)
+        else:
+            self._record(work, status="failed", error=work.error)
+
+    def run(
+        self,
+        file_paths: Iterable[str],
+        on_stage: Optional[Callable[[str, str], None]] = None,
+    ) -> List[IngestResult]:
+        """
+        Ingests the statements and returns one result per file: completed, skipped (already ingested) or failed.
+        `file_paths` may be a lazy iterable; it is consumed as extraction keeps up.
+        `on_stage(file_path, stage)` is called as each statement enters extract, parse and categorise.
+        Runs are independent, so one pipeline can serve several concurrent calls.
+        """
+        run = _Run(on_stage=on_stage)
+
+        parse_queue = queue.Queue(maxsize=self.queue_size)
+        categorise_queue = queue.Queue(maxsize=self.queue_size)
+        embed_queue = queue.Queue(maxsize=self.queue_size)
+        persist_queue = queue.Queue(maxsize=self.queue_size)
+
+        stages = [
+            _Stage(
+                "parse",
+                self._parse,
+                self.parse_workers,
+                parse_queue,
+                categorise_queue,
+                self._on_error,
+            ),
+            _Stage(
+                "categorise",
+                self._categorise,
+                self.categorise_workers,
+                categorise_queue,
+                embed_queue,
+                self._on_error,
+            ),
+            _Stage(
+                "embed",
+                self._embed,
+                self.embed_workers,
+                embed_queue,
+                persist_queue,
+                self._on_error,
+            ),
+            _Stage(
+                "persist",
+                self._persist,
+                self.persist_workers,
+                persist_queue,
+                None,
+                self._on_error,
+            ),
+        ]
+        for stage in stages:
+            stage.start()
+
+        try:
+            for work in self._source(run=run, file_paths=file_paths):
+                parse_queue.put(work)
+        finally:
+            parse_queue.put(_DONE)
+            for stage in stages:
+                stage.join()
+
+        return list(run.results)
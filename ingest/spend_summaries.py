@@ -0,0 +1,196 @@
+import threading
+import time
+from collections import defaultdict
+from datetime import date
+from enum import Enum
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import Date, case, cast, delete, func, text
+from sqlalchemy.dialects.postgresql import Insert, insert
+from sqlmodel import Session, select
+
+from models.tables import SpendSummary, Transaction
+from service import Service
+
+
+class ReadCache:
+    """
+    Thread-safe in-process cache for small read results. Entries expire after `ttl` seconds,
+    or never when `ttl` is None; writers in this process clear it explicitly.
+    """
+
+    def __init__(self, ttl: Optional[float] = None):
+        self.ttl = ttl
+        self._entries: Dict[Any, Tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            created_at, value = entry
+            if self.ttl is not None and time.monotonic() - created_at > self.ttl:
+                del self._entries[key]
+                return None
+            return value
+
+    def set(self, key, value) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class SpendSummaries:
+    """
+    Running totals per month, category and sign in spend_summaries, kept in step with the transactions table.
+    `add` runs in the transaction that inserts the transactions, on the rows that insert returned,
+    so the totals commit with the rows and a transaction skipped on a conflict is never counted.
+    Reads are cached until the next write through this instance, or `cache_ttl` seconds,
+    which bounds how stale summaries written by other processes can be.
+    """
+
+    # The transaction columns the totals are computed from, for the `returning` of the insert
+    columns = [Transaction.transaction_date, Transaction.category, Transaction.amount]
+
+    def __init__(self, service: Service, cache_ttl: Optional[float] = 60.0):
+        self.service = service
+        self.cache = ReadCache(ttl=cache_ttl)
+
+    @staticmethod
+    def _key(row) -> Tuple[date, Any, int]:
+        return (
+            row.transaction_date.replace(day=1),
+            row.category,
+            1 if row.amount > 0 else -1,
+        )
+
+    @staticmethod
+    def upsert_statement(rows: Sequence) -> Optional[Insert]:
+        """
+        Aggregates the rows, anything with transaction_date, category and amount, and upserts them onto the stored totals.
+        Keys are sorted so concurrent writers lock the summary rows in the same order.
+        """
+        totals: Dict[Tuple[date, Any, int], List[float]] = defaultdict(lambda: [0.0, 0])
+        for row in rows:
+            if not row.amount:
+                continue
+            total = totals[SpendSummaries._key(row)]
+            total[0] += row.amount
+            total[1] += 1
+
+        if not totals:
+            return None
+
+        values = [
+            {
+                "month": month,
+                "category": category,
+                "sign": sign,
+                "total": total,
+                "transactions": count,
+            }
+            for (month, category, sign), (total, count) in sorted(
+                totals.items(),
+                key=lambda item: (item[0][0], str(item[0][1]), item[0][2]),
+            )
+        ]
+
+        table = SpendSummary.__table__
+        statement = insert(table).values(values)
+        return statement.on_conflict_do_update(
+            constraint="uq_spend_summaries_month_category_sign",
+            set_={
+                "total": table.c.total + statement.excluded.total,
+                "transactions": table.c.transactions + statement.excluded.transactions,
+            },
+        )
+
+    def add(self, session: Session, rows: Sequence) -> None:
+        """
+        Adds inserted transaction rows onto the totals in the caller's session; call invalidate once it commits.
+        """
+        statement = self.upsert_statement(rows)
+        if statement is not None:
+            session.execute(statement)
+
+    @staticmethod
+    def rebuild_statements() -> List[Any]:
+        month = cast(func.date_trunc("month", Transaction.transaction_date), Date)
+        sign = case((Transaction.amount > 0, 1), else_=-1)
+
+        aggregate = (
+            select(
+                month,
+                Transaction.category,
+                sign,
+                func.sum(Transaction.amount),
+                func.count(),
+            ).where(Transaction.amount != 0)
+            # Ordinals, as the bound 'month' and sign literals would not match the select list on every driver
+            .group_by(text("1, 2, 3"))
+        )
+
+        table = SpendSummary.__table__
+        return [
+            delete(table),
+            insert(table).from_select(
+                ["month", "category", "sign", "total", "transactions"], aggregate
+            ),
+        ]
+
+    def rebuild(self) -> None:
+        """
+        Recomputes the totals from the transactions table, e.g. after a backfill
+        or for transactions stored before the summaries existed.
+        """
+        with self.service.transaction() as session:
+            for statement in self.rebuild_statements():
+                session.execute(statement)
+
+        self.invalidate()
+
+    def invalidate(self) -> None:
+        self.cache.clear()
+
+    @staticmethod
+    def read_statement(
+        month: Optional[date], category: Optional[Enum], sign: Optional[int]
+    ):
+        statement = select(SpendSummary)
+        if month is not None:
+            statement = statement.where(SpendSummary.month == month.replace(day=1))
+        if category is not None:
+            statement = statement.where(SpendSummary.category == category)
+        if sign is not None:
+            statement = statement.where(SpendSummary.sign == sign)
+        return statement.order_by(
+            SpendSummary.month, SpendSummary.category, SpendSummary.sign
+        )
+
+    def read(
+        self,
+        month: Optional[date] = None,
+        category: Optional[Enum] = None,
+        sign: Optional[int] = None,
+    ) -> List[SpendSummary]:
+        """
+        Reads the totals, optionally for one month, category and sign.
+        A fully specified key is a single fetch on the unique index.
+        """
+        key = (month.replace(day=1) if month else None, category, sign)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return list(cached)
+
+        with Session(self.service.engine) as session:
+            summaries = session.exec(
+                self.read_statement(month=month, category=category, sign=sign)
+            ).all()
+
+        self.cache.set(key, summaries)
+        return list(summaries)
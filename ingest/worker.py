@@ -0,0 +1,256 @@
+import logging
+import os
+import socket
+import threading
+from datetime import timedelta
+from typing import List, Optional, Set
+
+from sqlalchemy import func, select, update
+
+from enums.job_status import JobStatus
+from ingest.pipeline import IngestPipeline
+from models.tables import IngestionJob
+from service import Service
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue(service: Service, file_paths: List[str]) -> None:
+    service.create_many([IngestionJob(file_path=file_path) for file_path in file_paths])
+
+
+class JobQueue:
+    """
+    The ingestion_jobs table as a queue that any number of workers, on any number of machines, claim from.
+    """
+
+    def __init__(self, service: Service):
+        self.service = service
+
+    def claim(self, worker_id: str, limit: int = 1) -> List[IngestionJob]:
+        """
+        Marks up to `limit` of the oldest queued jobs as running for `worker_id` and returns them.
+        Rows locked by a concurrent claim are skipped (FOR UPDATE SKIP LOCKED), so any number of
+        workers can claim from the same queue without blocking each other or sharing a job.
+        """
+        claimable = (
+            select(IngestionJob.id)
+            .where(IngestionJob.status == JobStatus.queued)
+            .order_by(IngestionJob.created_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+
+        table = IngestionJob.__table__
+        statement = (
+            update(table)
+            .where(table.c.id.in_(claimable.scalar_subquery()))
+            .values(
+                status=JobStatus.running,
+                claimed_by=worker_id,
+                attempts=table.c.attempts + 1,
+                heartbeat_at=func.now(),
+                started_at=func.now(),
+                stage=None,
+            )
+            .returning(*table.columns)
+        )
+
+        with self.service.transaction() as session:
+            rows = session.execute(statement).all()
+
+        return [IngestionJob(**row._mapping) for row in rows]
+
+    def reclaim_stale(self, stale_after: float, max_attempts: int) -> int:
+        """
+        Re-queues running jobs whose worker has not sent a heartbeat for `stale_after` seconds,
+        or fails them once they have used `max_attempts`. Returns the number of jobs reclaimed.
+        """
+        stale = (
+            IngestionJob.status == JobStatus.running,
+            IngestionJob.heartbeat_at < func.now() - timedelta(seconds=stale_after),
+        )
+
+        with self.service.transaction() as session:
+            failed = session.execute(
+                update(IngestionJob)
+                .where(*stale, IngestionJob.attempts >= max_attempts)
+                .values(
+                    status=JobStatus.failed,
+                    claimed_by=None,
+                    error=f"Worker stopped sending heartbeats after {max_attempts} attempts",
+                    finished_at=func.now(),
+                )
+            )
+            requeued = session.execute(
+                update(IngestionJob)
+                .where(*stale, IngestionJob.attempts < max_attempts)
+                .values(status=JobStatus.queued, claimed_by=None)
+            )
+
+        return failed.rowcount + requeued.rowcount
+
+
+class IngestWorker:
+    """
+    Claims ingestion jobs from the database and runs up to `concurrency` of them at a time through an IngestPipeline.
+    Workers on any number of machines can share one database, since jobs are claimed with FOR UPDATE SKIP LOCKED.
+
+    While a job runs, its heartbeat is refreshed every `heartbeat_interval` seconds. Jobs whose worker
+    stopped sending heartbeats for `stale_after` seconds are re-queued by any worker, and a failed job is
+    retried, resuming from its checkpoint, until it has used `max_attempts`.
+    """
+
+    def __init__(
+        self,
+        service: Service,
+        pipeline: IngestPipeline,
+        concurrency: int = 2,
+        poll_interval: float = 5.0,
+        heartbeat_interval: float = 30.0,
+        stale_after: float = 300.0,
+        max_attempts: int = 3,
+        worker_id: Optional[str] = None,
+    ):
+        if heartbeat_interval >= stale_after:
+            raise ValueError("heartbeat_interval must be shorter than stale_after")
+
+        self.service = service
+        self.jobs = JobQueue(service=service)
+        self.pipeline = pipeline
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.heartbeat_interval = heartbeat_interval
+        self.stale_after = stale_after
+        self.max_attempts = max_attempts
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+
+        self._active: Set[int] = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def stop(self) -> None:
+        """
+        Stops claiming new jobs; jobs already running are finished.
+        """
+        self._stop.set()
+
+    def _heartbeat(self, finished: threading.Event) -> None:
+        # Runs until the slots have finished, so jobs still draining after stop() keep their claim
+        while not finished.wait(self.heartbeat_interval):
+            with self._lock:
+                job_ids = list(self._active)
+            if not job_ids:
+                continue
+
+            # A failed refresh is retried on the next beat; letting it end the thread would get every running job reclaimed
+            try:
+                self.service.update_where(
+                    IngestionJob,
+                    IngestionJob.id.in_(job_ids),
+                    IngestionJob.claimed_by == self.worker_id,
+                    heartbeat_at=func.now(),
+                )
+            except Exception:
+                logger.exception("Heartbeat for jobs %s failed", job_ids)
+
+    def _update_job(self, job: IngestionJob, **values) -> None:
+        # Guarded on the claim, so a job reclaimed from this worker is left to its new owner
+        self.service.update_where(
+            IngestionJob,
+            IngestionJob.id == job.id,
+            IngestionJob.claimed_by == self.worker_id,
+            **values,
+        )
+
+    def _process(self, job: IngestionJob) -> None:
+        def on_stage(file_path: str, stage: str) -> None:
+            self._update_job(job, stage=stage)
+
+        statement_id = None
+        try:
+            results = self.pipeline.run(file_paths=[job.file_path], on_stage=on_stage)
+            result = results[0]
+            statement_id = result.statement_id
+            error = result.error if result.status == "failed" else None
+        except Exception as e:
+            error = f"{e.__class__.__name__}: {e}"
+
+        if error is None:
+            self._update_job(
+                job,
+                status=JobStatus.completed,
+                statement_id=statement_id,
+                error=None,
+                finished_at=func.now(),
+            )
+        elif job.attempts < self.max_attempts:
+            self._update_job(
+                job,
+                status=JobStatus.queued,
+                statement_id=statement_id,
+                claimed_by=None,
+                error=error,
+            )
+        else:
+            self._update_job(
+                job,
+                status=JobStatus.failed,
+                statement_id=statement_id,
+                error=error,
+                finished_at=func.now(),
+            )
+
+    def _slot(self, exit_when_empty: bool) -> None:
+        while not self._stop.is_set():
+            jobs = self.jobs.claim(worker_id=self.worker_id, limit=1)
+            if not jobs:
+                if exit_when_empty:
+                    return
+                self._stop.wait(self.poll_interval)
+                continue
+
+            job = jobs[0]
+            with self._lock:
+                self._active.add(job.id)
+            try:
+                self._process(job)
+            finally:
+                with self._lock:
+                    self._active.discard(job.id)
+
+    def run(self, exit_when_empty: bool = False) -> None:
+        """
+        Processes jobs until stopped (or interrupted), or until the queue is empty when `exit_when_empty` is set.
+        """
+        self._stop.clear()
+
+        finished = threading.Event()
+        heartbeat = threading.Thread(
+            target=self._heartbeat, args=(finished,), name="heartbeat", daemon=True
+        )
+        heartbeat.start()
+
+        slots = [
+            threading.Thread(
+                target=self._slot, args=(exit_when_empty,), name=f"slot-{i}"
+            )
+            for i in range(self.concurrency)
+        ]
+        for slot in slots:
+            slot.start()
+
+        try:
+            while any(slot.is_alive() for slot in slots):
+                self.jobs.reclaim_stale(
+                    stale_after=self.stale_after, max_attempts=self.max_attempts
+                )
+                for slot in slots:
+                    slot.join(timeout=self.heartbeat_interval / len(slots))
+        except KeyboardInterrupt:
+            self.stop()
+            for slot in slots:
+                slot.join()
+        finally:
+            self._stop.set()
+            finished.set()
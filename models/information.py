@@ -1,9 +1,10 @@
 from datetime import date
 from typing import List, Optional
-from pgvector.sqlalchemy import Vector
+from pgvector.sqlalchemy import HALFVEC, Vector
 from sqlalchemy import Column
 from sqlmodel import Field, SQLModel
 
+from embeddings.config import EMBEDDING_DIMENSION, EMBEDDING_STORAGE
 from enums.category import CategoryEnum
 
 
@@ -36,7 +37,11 @@ class ParsedInformation(SQLModel):
 
     description_embedding: Optional[List[float]] = Field(
         default=None,
-        sa_column=Column(Vector(None)),
+        sa_column=Column(
+            HALFVEC(EMBEDDING_DIMENSION)
+            if EMBEDDING_STORAGE == "halfvec"
+            else Vector(EMBEDDING_DIMENSION)
+        ),
         description=(
             "A vector embedding representation of the cleaned description, used for semantic similarity searches. "
             "This facilitates matching transactions with similar descriptions for categorisation purposes."
@@ -58,4 +63,9 @@ class TrackedParsedInformation(SQLModel):
 
 
 class TransactionInformation(ParsedInformation, CategoryInformation):
-    pass
+    fingerprint: Optional[str] = Field(
+        default=None,
+        unique=True,
+        index=True,
+        description="Hash of the date, description, amount and occurrence within the statement, used for deduplication.",
+    )
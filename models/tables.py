@@ -1,11 +1,18 @@
-from datetime import date
-from typing import Any, List, Optional
-from sqlmodel import Column, Relationship, SQLModel, Field
-from pgvector.sqlalchemy import Vector
+from datetime import date, datetime, timezone
+from typing import List, Optional
+from sqlalchemy import Index, UniqueConstraint
+from sqlmodel import Relationship, SQLModel, Field
 
+from enums.category import CategoryEnum
+from enums.job_status import JobStatus
 from models.information import TransactionInformation
 
 
+def _now() -> datetime:
+    # SQLModel stores datetimes as timestamptz and rejects naive values
+    return datetime.now(timezone.utc)
+
+
 class ParsedStatement(SQLModel, table=True):
     __tablename__ = "parsed_statements"
     id: Optional[int] = Field(default=None, primary_key=True)
@@ -16,12 +23,24 @@ class ParsedStatement(SQLModel, table=True):
     statement: Optional["Statement"] = Relationship(back_populates="parsed_statements")
 
 
+class Category(SQLModel, table=True):
+    """
+    Reference table of the categories in CategoryEnum, kept in sync with Service.sync_enum.
+    """
+
+    __tablename__ = "categories"
+    id: Optional[int] = Field(default=None, primary_key=True)
+    name: str = Field(unique=True, index=True)
+
+
 class Statement(SQLModel, table=True):
     __tablename__ = "statements"
     id: Optional[int] = Field(default=None, primary_key=True)
 
     start_date: date
     end_date: date
+    file_digest: Optional[str] = Field(default=None, unique=True, index=True)
+    created_at: Optional[datetime] = Field(default_factory=_now)
 
     transactions: List["Transaction"] = Relationship(back_populates="statement")
     parsed_statements: List["ParsedStatement"] = Relationship(
@@ -31,6 +50,93 @@ class Statement(SQLModel, table=True):
 
 class Transaction(TransactionInformation, table=True):
     __tablename__ = "transactions"
+    __table_args__ = (
+        Index("ix_transactions_transaction_date", "transaction_date"),
+        Index("ix_transactions_statement_id", "statement_id"),
+    )
     id: Optional[int] = Field(default=None, primary_key=True)
     statement_id: Optional[int] = Field(default=None, foreign_key="statements.id")
     statement: Optional["Statement"] = Relationship(back_populates="transactions")
+
+
+class SpendSummary(SQLModel, table=True):
+    """
+    Running totals per month, category and sign, maintained in the same transaction as each statement insert.
+    `sign` is 1 for positive amounts and -1 for negative ones, the same split as silver_debits and silver_credits.
+    """
+
+    __tablename__ = "spend_summaries"
+    __table_args__ = (
+        UniqueConstraint(
+            "month", "category", "sign", name="uq_spend_summaries_month_category_sign"
+        ),
+    )
+    id: Optional[int] = Field(default=None, primary_key=True)
+
+    month: date
+    category: CategoryEnum
+    sign: int
+    total: float = 0.0
+    transactions: int = 0
+
+
+class IngestCheckpoint(SQLModel, table=True):
+    """
+    Progress of one statement through the ingestion pipeline.
+    `pending` holds the parsed transactions left after filtering (a ParsedInformationInputs JSON document)
+    and `fingerprints` their fingerprints by id, so a resumed run persists the same chunks without parsing again.
+    """
+
+    __tablename__ = "ingest_checkpoints"
+    id: Optional[int] = Field(default=None, primary_key=True)
+
+    file_digest: str = Field(unique=True, index=True)
+    file_path: str
+    statement_id: Optional[int] = Field(default=None, foreign_key="statements.id")
+    pending: str
+    fingerprints: str
+    chunk_size: int
+    total_chunks: int
+    created_at: datetime = Field(default_factory=_now)
+    completed_at: Optional[datetime] = None
+
+
+class IngestChunk(SQLModel, table=True):
+    __tablename__ = "ingest_chunks"
+    __table_args__ = (
+        UniqueConstraint(
+            "checkpoint_id", "chunk_index", name="uq_ingest_chunks_checkpoint_chunk"
+        ),
+    )
+    id: Optional[int] = Field(default=None, primary_key=True)
+
+    checkpoint_id: int = Field(foreign_key="ingest_checkpoints.id")
+    chunk_index: int
+    transactions: int
+    created_at: datetime = Field(default_factory=_now)
+
+
+class IngestionJob(SQLModel, table=True):
+    """
+    A statement waiting for, or going through, ingestion by a worker.
+    `stage` is the pipeline stage the statement last entered and `heartbeat_at` is refreshed
+    by the claiming worker while it runs, so jobs of a dead worker can be reclaimed.
+    """
+
+    __tablename__ = "ingestion_jobs"
+    __table_args__ = (
+        Index("ix_ingestion_jobs_status_created_at", "status", "created_at"),
+    )
+    id: Optional[int] = Field(default=None, primary_key=True)
+
+    file_path: str
+    status: JobStatus = JobStatus.queued
+    stage: Optional[str] = None
+    attempts: int = 0
+    claimed_by: Optional[str] = None
+    heartbeat_at: Optional[datetime] = None
+    statement_id: Optional[int] = Field(default=None, foreign_key="statements.id")
+    error: Optional[str] = None
+    created_at: datetime = Field(default_factory=_now)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
@@ -0,0 +1,66 @@
+import asyncio
+from datetime import date
+
+import pytest
+
+from async_service import AsyncService
+from enums.category import CategoryEnum
+from models.tables import Statement, Transaction
+
+pytest.importorskip("asyncpg")
+
+
+def transaction(day: int, embedding: float) -> Transaction:
+    return Transaction(
+        transaction_date=date(2024, 1, day),
+        description=f"PURCHASE {day}",
+        cleaned_description=f"Purchase {day}",
+        reasoning="",
+        category=CategoryEnum.food,
+        amount=-10.0 * day,
+        balance=100.0 - 10.0 * day,
+        fingerprint=f"fingerprint-{day}",
+        description_embedding=[embedding] + [0.0] * 383,
+    )
+
+
+def test_vectors_round_trip(service):
+    # The tables are set up by the synchronous fixture; only the driver differs
+    url = service.engine.url.set(drivername="postgresql+asyncpg")
+    async_service = AsyncService(
+        url=url.render_as_string(hide_password=False),
+        username=None,
+        password=None,
+        port=None,
+        database_name=None,
+    )
+
+    async def round_trip():
+        try:
+            await async_service.create_single(transaction(day=1, embedding=1.0))
+            await async_service.create_many([transaction(day=2, embedding=-1.0)])
+            await async_service.create_graph(
+                Statement(
+                    start_date=date(2024, 1, 1),
+                    end_date=date(2024, 1, 31),
+                    transactions=[transaction(day=3, embedding=0.5)],
+                )
+            )
+
+            stored = await async_service.read_all(Transaction)
+            nearest = await async_service.nearest_by_embedding(
+                embedding=[1.0] + [0.0] * 383,
+                embedding_column=Transaction.description_embedding,
+                columns=[Transaction.description],
+                limit=1,
+            )
+            return stored, nearest
+        finally:
+            await async_service.dispose()
+
+    stored, nearest = asyncio.run(round_trip())
+
+    embeddings = {t.description: list(t.description_embedding) for t in stored}
+    assert embeddings["PURCHASE 2"][:2] == [-1.0, 0.0]
+    assert len(embeddings) == 3
+    assert [row.description for row in nearest] == ["PURCHASE 1"]
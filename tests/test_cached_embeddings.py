@@ -0,0 +1,42 @@
+import threading
+from typing import List, Optional
+
+import numpy as np
+
+from embeddings.base_embeddings import BaseEmbeddings
+from embeddings.cached_embeddings import CachedEmbeddings
+
+
+class CountingEmbeddings(BaseEmbeddings):
+    def __init__(self):
+        super().__init__(model_name="counting")
+
+    def create_embedding(self, text: str) -> List[float]:
+        return [float(len(text))] * 4
+
+    def create_embedding_matrix(
+        self, texts: List[str], batch_size: Optional[int] = None
+    ) -> np.ndarray:
+        return np.array([[float(len(t))] * 4 for t in texts], dtype=np.float32).reshape(
+            len(texts), 4
+        )
+
+
+def test_counts_every_lookup_across_threads(tmp_path):
+    embeddings = CachedEmbeddings(
+        embeddings=CountingEmbeddings(), path=str(tmp_path / "cache" / "e.sqlite")
+    )
+
+    def lookups():
+        for i in range(200):
+            embeddings.create_embedding_matrix([f"UBER TRIP {i % 10}"])
+
+    threads = [threading.Thread(target=lookups) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stats = embeddings.stats()
+    assert stats["hits"] + stats["misses"] == 8 * 200
+    assert (tmp_path / "cache" / "e.sqlite").exists()
@@ -0,0 +1,89 @@
+import zlib
+from typing import List
+
+import numpy as np
+import pytest
+
+from embeddings.embeddings import Embeddings
+
+
+class FakeModel:
+    """
+    Stands in for a SentenceTransformer; `noise` perturbs the vectors like a lossy export would.
+    """
+
+    def __init__(self, noise: float = 0.0):
+        self.noise = noise
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return 8
+
+    def encode(self, texts: List[str], batch_size: int = 32, **kwargs) -> np.ndarray:
+        rows = []
+        for text in texts:
+            rng = np.random.default_rng(zlib.crc32(text.encode()))
+            vector = rng.normal(size=8)
+            rows.append(vector + self.noise * rng.normal(size=8))
+        return np.array(rows, dtype=np.float32)
+
+
+@pytest.fixture
+def loads(monkeypatch) -> List[str]:
+    loaded = []
+
+    def load(self):
+        loaded.append(self.backend)
+        return FakeModel(noise=0.0 if self.backend in ("torch", "onnx") else 2.0)
+
+    monkeypatch.setattr(Embeddings, "_load", load)
+    return loaded
+
+
+@pytest.fixture
+def parity_path(tmp_path) -> str:
+    return str(tmp_path / "parity.sqlite")
+
+
+def test_check_parity_needs_texts(loads):
+    with pytest.raises(ValueError, match="at least one text"):
+        Embeddings(backend="onnx").check_parity([])
+    assert loads == []
+
+
+def test_backend_is_checked_against_torch_once(loads, parity_path):
+    embeddings = Embeddings(backend="onnx", parity_path=parity_path)
+
+    assert embeddings.create_embedding_matrix(["UBER TRIP"]).shape == (1, 8)
+    assert loads == ["onnx", "torch"]
+
+    # A later load of the same export reuses the recorded result instead of loading torch again
+    Embeddings(backend="onnx", parity_path=parity_path).create_embedding_matrix(
+        ["UBER TRIP"]
+    )
+    assert loads == ["onnx", "torch", "onnx"]
+
+
+def test_backend_below_min_similarity_is_refused(loads, parity_path):
+    embeddings = Embeddings(backend="onnx-int8", parity_path=parity_path)
+
+    with pytest.raises(ValueError, match="cosine similarity"):
+        embeddings.create_embedding_matrix(["UBER TRIP"])
+    # Not kept, so the next call checks again rather than encoding with the refused model
+    assert embeddings._model is None
+
+    with pytest.raises(ValueError, match="cosine similarity"):
+        embeddings.create_embedding_matrix(["UBER TRIP"])
+    assert loads == ["onnx-int8", "torch", "onnx-int8"]
+
+
+def test_quantized_backend_has_a_lower_default_min_similarity():
+    assert Embeddings(backend="onnx-int8").min_similarity == 0.97
+    assert Embeddings(backend="onnx").min_similarity == 0.99
+    assert Embeddings(backend="onnx-int8", min_similarity=0.5).min_similarity == 0.5
+
+
+def test_parity_check_can_be_skipped(loads):
+    embeddings = Embeddings(backend="onnx-int8", parity_check=False)
+
+    embeddings.create_embedding_matrix(["UBER TRIP"])
+    assert loads == ["onnx-int8"]
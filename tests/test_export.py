@@ -0,0 +1,106 @@
+from datetime import date, datetime, timezone
+
+import pytest
+
+from enums.category import CategoryEnum
+from models.tables import IngestCheckpoint, Statement, Transaction
+
+pq = pytest.importorskip("pyarrow.parquet")
+
+
+def transaction(day: int, populated: bool) -> Transaction:
+    return Transaction(
+        transaction_date=date(2024, 1, day),
+        description=f"PURCHASE {day}",
+        cleaned_description=f"Purchase {day}",
+        reasoning="",
+        category=CategoryEnum.food,
+        amount=-10.0 * day,
+        balance=100.0 - 10.0 * day,
+        fingerprint=f"fingerprint-{day}" if populated else None,
+        description_embedding=[float(day)] * 384 if populated else None,
+    )
+
+
+def test_parquet_export_keeps_column_types_across_chunks(service, tmp_path):
+    # The nullable columns are NULL for the whole first chunk and populated in the second
+    statement = Statement(start_date=date(2024, 1, 1), end_date=date(2024, 1, 31))
+    statement.transactions = [transaction(day, populated=day > 2) for day in (1, 2, 3)]
+    service.create_graph(statement)
+
+    path = service.export(
+        model=Transaction,
+        file_name=str(tmp_path / "transactions"),
+        file_format="parquet",
+        chunk_size=2,
+    )
+
+    table = pq.read_table(path).sort_by("transaction_date")
+    assert table.schema.field("fingerprint").type == "string"
+    assert table.column("fingerprint").to_pylist() == [None, None, "fingerprint-3"]
+    embeddings = table.column("description_embedding").to_pylist()
+    assert embeddings[:2] == [None, None]
+    assert embeddings[2] == [3.0] * 384
+    assert table.column("category").to_pylist() == ["food"] * 3
+
+
+def test_parquet_export_of_an_empty_table_has_the_table_schema(service, tmp_path):
+    path = service.export(
+        model=Statement, file_name=str(tmp_path / "statements"), file_format="parquet"
+    )
+
+    table = pq.read_table(path)
+    assert table.num_rows == 0
+    assert str(table.schema.field("start_date").type) == "date32[day]"
+
+
+def test_parquet_export_types_timestamps(service, tmp_path):
+    statement = Statement(start_date=date(2024, 1, 1), end_date=date(2024, 1, 31))
+    service.create_graph(statement)
+    created_at = datetime(2024, 2, 1, 12, 30, tzinfo=timezone.utc)
+    service.create_many(
+        [
+            IngestCheckpoint(
+                file_digest=f"digest-{i}",
+                file_path=f"statement-{i}.pdf",
+                statement_id=statement.id,
+                pending="{}",
+                fingerprints="{}",
+                chunk_size=200,
+                total_chunks=0,
+                created_at=created_at,
+                completed_at=created_at if i == 2 else None,
+            )
+            for i in (0, 1, 2)
+        ]
+    )
+
+    path = service.export(
+        model=IngestCheckpoint,
+        file_name=str(tmp_path / "checkpoints"),
+        file_format="parquet",
+        chunk_size=2,
+    )
+
+    table = pq.read_table(path).sort_by("file_digest")
+    assert str(table.schema.field("created_at").type) == "timestamp[us, tz=UTC]"
+    assert table.column("completed_at").to_pylist() == [None, None, created_at]
+
+
+def test_export_rejects_unknown_columns(tmp_path, capsys):
+    import cli
+
+    with pytest.raises(SystemExit) as exit_info:
+        cli.main(
+            [
+                "export",
+                "transactions",
+                str(tmp_path / "out"),
+                "--columns",
+                "amount",
+                "amonut",
+            ]
+        )
+
+    assert exit_info.value.code == 2
+    assert "unknown columns for transactions: amonut" in capsys.readouterr().err
@@ -0,0 +1,55 @@
+import time
+from typing import List
+
+from extract.extract import Extract
+from extract.parser import Parser
+
+
+class SleepingParser(Parser):
+    def __init__(self, seconds: float):
+        super().__init__()
+        self.seconds = seconds
+
+    def parse_document(self, file_path: str) -> str:
+        time.sleep(self.seconds)
+        return file_path
+
+    def parse_documents(self, file_paths: List[str]) -> List[str]:
+        return [self.parse_document(file_path) for file_path in file_paths]
+
+
+class HangingParser(SleepingParser):
+    pass
+
+
+def test_timeout_does_not_wait_for_a_hung_worker():
+    extract = Extract(parsers=[HangingParser(seconds=30), SleepingParser(seconds=0)])
+
+    start = time.monotonic()
+    results = list(
+        extract.extract_from_files(file_paths=["a.pdf"], timeout=1, max_workers=1)
+    )
+    elapsed = time.monotonic() - start
+
+    errors = {result.strategy_name: result.error for result in results}
+    assert errors["HangingParser"] == "Timed out after 1 seconds"
+    # The task queued behind the hung one runs on a new pool
+    assert errors["SleepingParser"] is None
+    assert elapsed < 10
+
+
+def test_timeout_is_measured_from_the_task_start():
+    # With one worker the last task waits behind the others; its wait would exceed the timeout, its run does not
+    extract = Extract(
+        parsers=[
+            SleepingParser(seconds=0.1),
+            SleepingParser(seconds=1.5),
+            SleepingParser(seconds=1.5),
+        ]
+    )
+
+    results = list(
+        extract.extract_from_files(file_paths=["a.pdf"], timeout=2, max_workers=1)
+    )
+
+    assert [result.error for result in results] == [None] * 3
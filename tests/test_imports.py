@@ -0,0 +1,62 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+# Libraries that cost seconds to import and are only needed by the commands that use them
+HEAVY = [
+    "langgraph",
+    "langchain",
+    "langchain_core",
+    "torch",
+    "sentence_transformers",
+    "tika",
+    "google.genai",
+    "pandas",
+    "pyarrow",
+    "numpy",
+]
+
+
+def _import(module: str) -> dict:
+    """
+    Imports `module` in a fresh interpreter and reports how long it took and which heavy libraries it loaded.
+    """
+    code = f"""
+import json, sys, time
+start = time.perf_counter()
+import {module}
+seconds = time.perf_counter() - start
+print(json.dumps({{"seconds": seconds, "loaded": [m for m in {HEAVY!r} if m in sys.modules]}}))
+"""
+    output = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=Path(__file__).parents[1],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def test_cli_starts_without_heavy_libraries():
+    result = _import("cli")
+
+    assert result["loaded"] == []
+    # Generous, so a slow CI machine does not fail it; a heavy import alone takes seconds
+    assert result["seconds"] < 1.0
+
+
+@pytest.mark.parametrize("module", ["ingest.pipeline", "ingest.worker"])
+def test_pipeline_modules_defer_the_agent_and_model_libraries(module):
+    assert _import(module)["loaded"] == []
+
+
+def test_export_path_defers_the_vector_libraries():
+    # What `cli export` imports before it writes; CSV needs nothing else, Parquet adds pyarrow
+    result = _import("cli, components, service, models.tables")
+
+    assert result["loaded"] == []
+    assert result["seconds"] < 1.5
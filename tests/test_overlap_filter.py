@@ -0,0 +1,79 @@
+from datetime import date
+
+from enums.category import CategoryEnum
+from ingest.fingerprint import fingerprint_transactions
+from ingest.overlap_filter import OverlapFilter
+from models.information import ParsedInformation, TrackedParsedInformation
+from models.tables import Statement, Transaction
+
+FEE = ("MONTHLY FEE", -5.00)
+
+
+def parsed(*rows) -> list:
+    return [
+        TrackedParsedInformation(
+            id=str(i),
+            data=ParsedInformation(
+                transaction_date=date(2024, 1, day),
+                description=description,
+                amount=amount,
+                balance=0.0,
+            ),
+        )
+        for i, (day, description, amount) in enumerate(rows)
+    ]
+
+
+def store(service, rows, fingerprinted: bool) -> None:
+    data = [p.data for p in rows]
+    fingerprints = (
+        fingerprint_transactions(data) if fingerprinted else [None] * len(data)
+    )
+    service.create_graph(
+        Statement(
+            start_date=date(2024, 1, 1),
+            end_date=date(2024, 1, 31),
+            transactions=[
+                Transaction(
+                    **d.model_dump(exclude={"description_embedding"}),
+                    category=CategoryEnum.food,
+                    reasoning="",
+                    cleaned_description=d.description,
+                    fingerprint=f,
+                )
+                for d, f in zip(data, fingerprints)
+            ],
+        )
+    )
+
+
+def descriptions(rows) -> list:
+    return [(p.data.transaction_date.day, p.data.description) for p in rows]
+
+
+def test_overlap_with_rows_stored_before_fingerprints(service):
+    # Two genuine identical fees were stored by a statement ingested before fingerprints existed
+    store(service, parsed((2, *FEE), (2, *FEE), (5, "UBER TRIP", -45.50)), False)
+
+    incoming = parsed(
+        (2, *FEE),
+        (2, *FEE),
+        (2, *FEE),
+        (5, "UBER TRIP", -45.50),
+        (9, "NETFLIX.COM", -199.99),
+    )
+
+    assert descriptions(OverlapFilter(service=service).filter(incoming)) == [
+        (2, "MONTHLY FEE"),
+        (9, "NETFLIX.COM"),
+    ]
+
+
+def test_overlap_with_fingerprinted_rows(service):
+    store(service, parsed((5, "UBER TRIP", -45.50), (9, "NETFLIX.COM", -199.99)), True)
+
+    incoming = parsed((9, "NETFLIX.COM", -199.99), (15, "TAKEALOT", -54.51))
+
+    assert descriptions(OverlapFilter(service=service).filter(incoming)) == [
+        (15, "TAKEALOT")
+    ]
@@ -0,0 +1,122 @@
+import json
+import threading
+from typing import List, Optional
+
+import numpy as np
+
+from agent.agent_chain import AgentChain
+from embeddings.base_embeddings import BaseEmbeddings
+from enums.category import CategoryEnum
+from extract.extract import Extract
+from extract.parser import Parser
+from extract.template_parser import TemplateParser
+from ingest.overlap_filter import OverlapFilter
+from ingest.pipeline import IngestPipeline
+from ingest.spend_summaries import SpendSummaries
+from models.information import CategoryInformation, TrackedCategoryInformation
+from models.inputs import CategoryInformationInputs
+from models.tables import Transaction
+
+JANUARY = """\
+2024/01/01 Opening balance 1,000.00
+2024/01/02 WOOLWORTHS 1234 -100.00 900.00
+2024/01/05 SALARY ACME LTD 2,500.00 3,400.00
+2024/01/09 NETFLIX.COM -199.99 3,200.01
+2024/01/15 UBER TRIP -45.50 3,154.51
+"""
+
+# Overlaps JANUARY on its last two transactions
+MID_JANUARY = """\
+2024/01/08 Balance brought forward 3,400.00
+2024/01/09 NETFLIX.COM -199.99 3,200.01
+2024/01/15 UBER TRIP -45.50 3,154.51
+2024/01/20 ENGEN GARAGE -600.00 2,554.51
+2024/01/25 TAKEALOT -54.51 2,500.00
+"""
+
+
+class TextParser(Parser):
+    def parse_document(self, file_path: str) -> str:
+        with open(file_path) as file:
+            return file.read()
+
+    def parse_documents(self, file_paths: List[str]) -> List[str]:
+        return [self.parse_document(file_path) for file_path in file_paths]
+
+
+class CategorisingAgent:
+    """
+    Categorises everything as food. Calls wait for each other, so every statement has been
+    parsed and filtered before any of its transactions are persisted.
+    """
+
+    def __init__(self, parties: int):
+        self.barrier = threading.Barrier(parties)
+
+    def invoke_agent(self, content: str) -> CategoryInformationInputs:
+        self.barrier.wait(timeout=30)
+        ids = [id for row in json.loads(content) for id in row]
+        return CategoryInformationInputs(
+            category_information_inputs=[
+                TrackedCategoryInformation(
+                    id=id,
+                    data=CategoryInformation(
+                        category=CategoryEnum.food,
+                        reasoning="",
+                        cleaned_description="",
+                    ),
+                )
+                for id in ids
+            ]
+        )
+
+
+class ConstantEmbeddings(BaseEmbeddings):
+    def __init__(self):
+        super().__init__(model_name="constant")
+
+    def create_embedding(self, text: str) -> List[float]:
+        return [1.0] * 384
+
+    def create_embedding_matrix(
+        self, texts: List[str], batch_size: Optional[int] = None
+    ) -> np.ndarray:
+        return np.ones((len(texts), 384), dtype=np.float32)
+
+
+def test_overlapping_statements_in_one_run_are_stored_once(service, tmp_path):
+    paths = []
+    for name, text in (("january", JANUARY), ("mid_january", MID_JANUARY)):
+        path = tmp_path / f"{name}.txt"
+        path.write_text(text)
+        paths.append(str(path))
+
+    spend_summaries = SpendSummaries(service=service)
+    pipeline = IngestPipeline(
+        service=service,
+        extract=Extract(parsers=[TextParser()], max_workers=2),
+        agent_chain=AgentChain(
+            parsing_agent=None,
+            categorising_agent=CategorisingAgent(parties=2),
+            transaction_filter=OverlapFilter(service=service).filter,
+            template_parser=TemplateParser(),
+        ),
+        embeddings=ConstantEmbeddings(),
+        spend_summaries=spend_summaries,
+        parse_workers=2,
+        categorise_workers=2,
+    )
+
+    results = pipeline.run(file_paths=paths)
+
+    assert [result.status for result in results] == ["completed", "completed"]
+    assert sum(result.transactions for result in results) == 6
+
+    transactions = service.read_all(Transaction)
+    assert len(transactions) == 6
+    assert len({t.fingerprint for t in transactions}) == 6
+
+    totals = {s.sign: (s.total, s.transactions) for s in spend_summaries.read()}
+    assert totals[1] == (2500.00, 1)
+    assert round(totals[-1][0], 2) == -1000.00
+    assert totals[-1][1] == 5
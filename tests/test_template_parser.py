@@ -0,0 +1,73 @@
+from extract.template_parser import TemplateParser
+
+STATEMENT = """\
+Statement period 2024/01/01 to 2024/01/31
+Date Description Amount Balance
+2024/01/01 Opening balance 1,000.00
+2024/01/02 WOOLWORTHS 1234 -100.00 900.00
+2024/01/05 SALARY ACME LTD 2,500.00 3,400.00
+2024/01/09 NETFLIX.COM -199.99 3,200.01
+2024/01/15 UBER TRIP -45.50 3,154.51
+"""
+
+
+def parse(text: str):
+    return TemplateParser().parse(text)
+
+
+def amounts(text: str):
+    parsed = parse(text)
+    return [row.data.amount for row in parsed.parsed_information_inputs]
+
+
+def test_parses_a_reconciling_statement():
+    assert amounts(STATEMENT) == [-100.00, 2500.00, -199.99, -45.50]
+
+
+def test_parses_newest_first():
+    lines = STATEMENT.splitlines()
+    newest_first = "\n".join(lines[:3] + lines[3:][::-1])
+
+    assert amounts(newest_first) == [-45.50, -199.99, 2500.00, -100.00]
+
+
+def test_falls_back_when_the_first_row_does_not_match():
+    text = STATEMENT.replace("WOOLWORTHS 1234 -100.00", "WOOLWORTHS 1234 -100")
+
+    assert parse(text) is None
+
+
+def test_falls_back_when_the_last_row_does_not_match():
+    text = STATEMENT.replace("UBER TRIP -45.50 3,154.51", "UBER TRIP -45.50 3154")
+
+    assert parse(text) is None
+
+
+def test_falls_back_when_a_body_line_does_not_match():
+    text = STATEMENT.replace(
+        "2024/01/09 NETFLIX.COM",
+        "2024/01/07 ATM WITHDRAWAL 0.00\n2024/01/09 NETFLIX.COM",
+    )
+
+    assert parse(text) is None
+
+
+def test_falls_back_when_the_first_amount_does_not_reconcile_with_the_opening_balance():
+    lines = STATEMENT.splitlines()
+    newest_first = "\n".join(lines[:3] + lines[3:][::-1])
+
+    for amount in ("100.00", "-700.00"):
+        assert parse(STATEMENT.replace("-100.00 900.00", f"{amount} 900.00")) is None
+        assert parse(newest_first.replace("-100.00 900.00", f"{amount} 900.00")) is None
+
+
+def test_falls_back_without_an_opening_balance():
+    text = STATEMENT.replace("2024/01/01 Opening balance 1,000.00\n", "")
+
+    assert parse(text) is None
+
+
+def test_falls_back_when_rows_do_not_reconcile():
+    text = STATEMENT.replace("3,400.00", "3,500.00")
+
+    assert parse(text) is None
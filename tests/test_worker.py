@@ -0,0 +1,53 @@
+import threading
+
+from enums.job_status import JobStatus
+from ingest.worker import IngestWorker, JobQueue, enqueue
+from models.tables import IngestionJob
+
+
+class FlakyService:
+    """
+    Fails the first heartbeat, like a dropped database connection, and records the rest.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.beats = threading.Event()
+
+    def update_where(self, model, *where, **values):
+        self.calls += 1
+        if self.calls == 1:
+            raise ConnectionError("connection reset")
+        self.beats.set()
+
+
+def test_heartbeat_survives_a_failed_refresh():
+    service = FlakyService()
+    worker = IngestWorker(
+        service=service, pipeline=None, heartbeat_interval=0.05, stale_after=1.0
+    )
+    worker._active.add(1)
+
+    finished = threading.Event()
+    heartbeat = threading.Thread(target=worker._heartbeat, args=(finished,))
+    heartbeat.start()
+    try:
+        assert service.beats.wait(timeout=5)
+        assert heartbeat.is_alive()
+    finally:
+        finished.set()
+        heartbeat.join()
+
+
+def test_jobs_are_claimed_once_and_reclaimed_when_stale(service):
+    enqueue(service=service, file_paths=["a.pdf", "b.pdf"])
+    jobs = JobQueue(service=service)
+
+    first = jobs.claim(worker_id="first")
+    second = jobs.claim(worker_id="second")
+
+    assert [job.file_path for job in first + second] == ["a.pdf", "b.pdf"]
+    assert jobs.claim(worker_id="third") == []
+
+    assert jobs.reclaim_stale(stale_after=0, max_attempts=1) == 2
+    assert {job.status for job in service.read_all(IngestionJob)} == {JobStatus.failed}